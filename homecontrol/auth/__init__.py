@@ -42,7 +42,8 @@ class AuthManager:
             loop=loop,
             storage_init=lambda: {},
             loader=self._load_refresh_tokens,
-            dumper=self._dump_refresh_tokens,)
+            dumper=self._dump_refresh_tokens,
+            journal=True)
         self.refresh_tokens = DictWrapper(token_storage)
         self.auth_codes: Dict[str, AuthorizationCode] = {}
         self.credential_providers = {
@@ -1,6 +1,11 @@
 import argparse
 import asyncio
 import os
+from typing import Optional
+
+from homecontrol.dependencies.storage import Storage
+from homecontrol.dependencies.storage_engines import create_engine
+from homecontrol.dependencies.yaml_loader import YAMLLoader
 
 from .commands import COMMANDS
 
@@ -20,9 +25,21 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def load_storage_config(cfg_dir: str) -> Optional[dict]:
+    """Returns the storage configuration of HomeControl"""
+    cfg_file = os.path.join(cfg_dir, "configuration.yaml")
+    if not os.path.isfile(cfg_file):
+        return None
+    with open(cfg_file) as file:
+        return YAMLLoader.load(file, cfg_folder=cfg_dir).get("storage")
+
+
 def main() -> None:
     """Main function getting called by command-line"""
     args = parse_args()
     loop = asyncio.get_event_loop()
+    engine = create_engine(args.cfgdir, load_storage_config(args.cfgdir))
     command = COMMANDS[args.command](args, loop)
     loop.run_until_complete(command.run())
+    loop.run_until_complete(Storage.flush_all())
+    engine.close()
@@ -17,15 +17,34 @@ ITEM_STATE_NOT_FOUND = "error-item-state-not-found"
 ITEM_ACTION_NOT_FOUND = "error-item-action-not-found"
 ERROR_INVALID_ITEM_STATES = "error-invalid-item-states"
 ERROR_INVALID_ITEM_STATE = "error-invalid-item-state"
+ERROR_INVALID_ITEM_STATUS = "error-invalid-item-status"
 
 EVENT_CORE_BOOTSTRAP_COMPLETE = "core_bootstrap_complete"
 EVENT_ITEM_CREATED = "item_created"
 EVENT_ITEM_REMOVED = "item_removed"
 EVENT_ITEM_NOT_WORKING = "item_not_working"
 EVENT_ITEM_STATUS_CHANGED = "item_status_changed"
+EVENT_ITEM_STARTUP_PROGRESS = "item_startup_progress"
+EVENT_ITEM_STARTUP_COMPLETE = "item_startup_complete"
 EVENT_MODULE_LOADED = "module_loaded"
+EVENT_STATE_CHANGE = "state_change"
 
 MAX_PENDING_WS_MSGS = 512
+MAX_WS_BATCH_DELAY = 1000
+MAX_WS_JOURNAL_ENTRIES = 4096
+WS_SNAPSHOT_MAX_AGE = 5
+STATE_DUMP_TIMEOUT = 10
+MAX_CACHED_RESPONSES = 256
+# Seconds to collect changes before a storage is written
+STORAGE_SAVE_DELAY = 1
+# Size in bytes after which a storage journal is compacted
+STORAGE_JOURNAL_MAX_SIZE = 2 ** 20
+# Fraction of the poll interval that polled states are randomly delayed by
+POLL_JITTER = 0.1
+# Factor by which adaptive poll intervals grow while values don't change
+POLL_BACKOFF = 2
+# Seconds after the last read until an item counts as unwatched
+POLL_IDLE_TIMEOUT = 60
 
 ATTRIBUTION = "attribution"
 
@@ -36,3 +55,5 @@ class ItemStatus(Enum):
     OFFLINE = "offline"
     STOPPED = "stopped"
     WAITING_FOR_DEPENDENCY = "waiting-for-dependency"
+    # Configured but only created on first access
+    LAZY = "lazy"
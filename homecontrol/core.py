@@ -14,6 +14,9 @@ from homecontrol.dependencies.config_manager import ConfigManager
 from homecontrol.dependencies.event_bus import EventBus
 from homecontrol.dependencies.item_manager import ItemManager
 from homecontrol.dependencies.module_manager import ModuleManager
+from homecontrol.dependencies.scheduler import PollScheduler
+from homecontrol.dependencies.storage import Storage
+from homecontrol.dependencies.storage_engines import create_engine
 from homecontrol.dependencies.uuid import get_uuid
 
 LOGGER = logging.getLogger(__name__)
@@ -43,7 +46,9 @@ class Core:
         self.cfg_path = cfg_file
         self.cfg_dir = os.path.dirname(cfg_file)
         self.block_future = asyncio.Future()
+        self.storage_engine = create_engine(self.cfg_dir, cfg.get("storage"))
         self.event_bus = EventBus(core=self)
+        self.scheduler = PollScheduler(core=self)
         self.module_manager = ModuleManager(core=self)
         self.modules = self.module_manager.module_accessor
         self.item_manager = ItemManager(core=self)
@@ -61,6 +66,9 @@ class Core:
             signal.signal(signal.SIGINT, self.shutdown)
             signal.signal(signal.SIGTERM, self.shutdown)
 
+        await self.event_bus.init()
+        await self.scheduler.init()
+
         # Load modules
         await self.module_manager.init()
 
@@ -88,6 +96,9 @@ class Core:
         LOGGER.warning("Shutting Down")
         await self.item_manager.stop()
         await self.module_manager.stop()
+        await self.scheduler.stop()
+        await Storage.flush_all()
+        self.storage_engine.close()
 
         pending = [task
                    for task
@@ -4,7 +4,9 @@ Every new Item or Module will get one of these classes as a base class
 """
 
 import logging
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, cast
+from types import MethodType
+from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Optional,
+                    Tuple, cast)
 
 import voluptuous as vol
 
@@ -33,6 +35,11 @@ class Item:
     module: Optional["Module"]
     states: StateProxy
     actions: Dict[str, Callable]
+    # (name, StateDef) and (action name, function) pairs of the class,
+    # set in __init_subclass__
+    state_defs: Tuple[Tuple[str, StateDef], ...] = ()
+    action_defs: Tuple[Tuple[str, Callable], ...] = ()
+    _implements: Optional[List[str]] = None
 
     @classmethod
     async def constructor(
@@ -52,14 +59,16 @@ class Item:
         item.states = StateProxy(
             item, core, state_defaults=state_defaults or {})
 
-        item.actions = {}
-        for attribute in dir(item):
-            func = getattr(item, attribute)
-            if hasattr(func, "action_name"):
-                item.actions[getattr(func, "action_name")] = func
+        item.actions = item.bind_actions()
 
         return item
 
+    def bind_actions(self) -> Dict[str, Callable]:
+        """Returns the actions of the item class bound to the item"""
+        return {
+            name: MethodType(func, self) for name, func in self.action_defs
+        }
+
     def __repr__(self) -> str:
         return (f"<Item {self.type} identifier={self.identifier} "
                 f"name={self.name}>")
@@ -78,8 +87,8 @@ class Item:
         if status is previous_status:
             return
         self.status = status
-        self.core.event_bus.broadcast(
-            EVENT_ITEM_STATUS_CHANGED, item=self, previous=previous_status)
+        self.core.event_bus.broadcast_item_event(
+            EVENT_ITEM_STATUS_CHANGED, self, previous=previous_status)
 
     async def run_action(
             self, name: str, kwargs: Dict[str, Any]) -> Any:
@@ -91,23 +100,54 @@ class Item:
 
     @classmethod
     def __init_subclass__(cls, **kwargs) -> None:
-        for name in dir(cls):
-            state_def: StateDef = getattr(cls, name)
-            if not isinstance(state_def, StateDef):
-                continue
-            setattr(cls, name, state_def.inherit(cls))
+        # Class dictionaries are used so that properties aren't evaluated
+        attributes: Dict[str, Any] = {}
+        for klass in reversed(cls.__mro__):
+            attributes.update(vars(klass))
+
+        state_defs = []
+        action_defs = []
+        for name, attribute in sorted(attributes.items()):
+            if isinstance(attribute, StateDef):
+                state_def = attribute.inherit(cls)
+                setattr(cls, name, state_def)
+                state_defs.append((name, state_def))
+            elif (callable(attribute)
+                  and hasattr(attribute, "action_name")):
+                action_defs.append((attribute.action_name, attribute))
+        cls.state_defs = tuple(state_defs)
+        cls.action_defs = tuple(action_defs)
 
         super().__init_subclass__(**kwargs)
 
     @property
     def implements(self) -> List[str]:
         """Returns all the item types the item implements"""
-        mro: List[type] = type(self).mro()
-        return [
-            cast(str, cast(Item, item_type).type)
-            for item_type in mro[:mro.index(Item)]
-            if getattr(item_type, "type", None)
-        ]
+        return type(self).get_implements()
+
+    @classmethod
+    def get_implements(cls) -> List[str]:
+        """
+        Returns all the item types the class implements
+        The result is cached per class until reset_implements is called
+        """
+        implements = cls.__dict__.get("_implements")
+        if implements is None:
+            mro: List[type] = cls.mro()
+            implements = [
+                cast(str, cast(Item, item_type).type)
+                for item_type in mro[:mro.index(Item)]
+                if getattr(item_type, "type", None)
+            ]
+            cls._implements = implements
+        return implements
+
+    @classmethod
+    def reset_implements(cls) -> None:
+        """Resets the cached implemented types of the class and subclasses"""
+        cls._implements = None
+        for subclass in cls.__subclasses__():
+            subclass.reset_implements()
 
     @property
     def metadata(self) -> Dict[str, Any]:
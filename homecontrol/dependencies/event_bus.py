@@ -2,12 +2,41 @@
 
 import asyncio
 import logging
-from collections import defaultdict
+import time
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Any, Callable, List, Tuple, Union
+from typing import (TYPE_CHECKING, Any, Callable, Deque, Dict, List,
+                    Optional, Sequence, Set, Tuple, Union)
+
+import voluptuous as vol
+
+from homecontrol.const import EVENT_STATE_CHANGE
+
+if TYPE_CHECKING:
+    from homecontrol.dependencies.entity_types import Item
 
 LOGGER = logging.getLogger(__name__)
 
+OVERFLOW_DROP_OLDEST = "drop-oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_BLOCK)
+
+DEFAULT_MAX_QUEUE = 128
+
+# Resolved hierarchical event types cached at most
+MAX_PATTERN_CACHE = 4096
+
+HandlerTuples = Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]
+NO_HANDLERS: HandlerTuples = ((), ())
+
+CONFIG_SCHEMA = vol.Schema({
+    vol.Required("coalesce-state-changes", default=False): bool,
+    vol.Required("coalesce-window", default=0): vol.All(
+        vol.Coerce(float), vol.Range(min=0)),
+    vol.Required("record-stats", default=False): bool
+})
+
 
 # pylint: disable=too-few-public-methods
 class Event:
@@ -29,12 +58,399 @@ class Event:
         return f"<Event {self.event_type} kwargs={self.kwargs} {self.data}>"
 
 
+def is_pattern(event_type: str) -> bool:
+    """Checks if a hierarchical event type contains a wildcard"""
+    return event_type != "*" and "*" in event_type.split(".")
+
+
+def item_event_type(event_type: str, item: "Item") -> str:
+    """Returns the hierarchical event type for an item event"""
+    return f"item.{event_type}.{item.unique_identifier}"
+
+
+class _TrieNode:
+    """A node of EventPatternTrie"""
+    __slots__ = ("children", "patterns", "tail_patterns")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Patterns ending at this node
+        self.patterns: Set[str] = set()
+        # Patterns ending with a * after this node
+        self.tail_patterns: Set[str] = set()
+
+
+class EventPatternTrie:
+    """
+    Matches hierarchical event types against wildcard patterns
+
+    Event types are separated by dots.
+    A * matches exactly one segment and a trailing * any number
+    of remaining segments but at least one.
+    Examples:
+    item.state_change.* matches item.state_change.<unique_identifier>
+    item.*.lamp matches every item event for lamp
+    item.* matches every item event
+    """
+
+    def __init__(self) -> None:
+        self.root = _TrieNode()
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, pattern: str) -> None:
+        """Adds a pattern"""
+        *segments, last = pattern.split(".")
+        node = self.root
+        for segment in segments:
+            node = node.children.setdefault(segment, _TrieNode())
+        if last == "*":
+            patterns = node.tail_patterns
+        else:
+            patterns = node.children.setdefault(last, _TrieNode()).patterns
+        if pattern not in patterns:
+            patterns.add(pattern)
+            self.count += 1
+
+    def remove(self, pattern: str) -> None:
+        """Removes a pattern"""
+        *segments, last = pattern.split(".")
+        node = self.root
+        for segment in segments if last == "*" else segments + [last]:
+            node = node.children.get(segment)
+            if not node:
+                return
+        patterns = node.tail_patterns if last == "*" else node.patterns
+        if pattern in patterns:
+            patterns.discard(pattern)
+            self.count -= 1
+
+    def match(self, event_type: str) -> Set[str]:
+        """Returns the patterns matching an event type"""
+        segments = event_type.split(".")
+        length = len(segments)
+        result = set()
+        stack = [(self.root, 0)]
+        while stack:
+            node, index = stack.pop()
+            if index == length:
+                result.update(node.patterns)
+                continue
+            result.update(node.tail_patterns)
+            child = node.children.get(segments[index])
+            if child:
+                stack.append((child, index + 1))
+            wildcard = node.children.get("*")
+            if wildcard:
+                stack.append((wildcard, index + 1))
+        return result
+
+
+class HandlerStats:
+    """Latency and throughput statistics for an event handler"""
+    __slots__ = ("event_type", "handler", "invocations", "total_time",
+                 "max_time", "exceptions")
+
+    def __init__(self, event_type: str, handler: Callable) -> None:
+        self.event_type = event_type
+        self.handler = handler
+        self.invocations = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.exceptions = 0
+
+    def record(self, duration: float) -> None:
+        """Records an invocation"""
+        self.invocations += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+
+    def wrap_sync(self, handler: Callable) -> Callable:
+        """Wraps a synchronous handler to record its invocations"""
+        def _wrapper(event: Event, **kwargs) -> Any:
+            start = time.perf_counter()
+            try:
+                return handler(event, **kwargs)
+            except Exception:
+                self.exceptions += 1
+                raise
+            finally:
+                self.record(time.perf_counter() - start)
+        return _wrapper
+
+    def wrap(self, handler: Callable) -> Callable:
+        """Wraps a coroutine handler to record its invocations"""
+        async def _wrapper(event: Event, **kwargs) -> Any:
+            start = time.perf_counter()
+            try:
+                return await handler(event, **kwargs)
+            except Exception:
+                self.exceptions += 1
+                raise
+            finally:
+                self.record(time.perf_counter() - start)
+        return _wrapper
+
+    def dump(self) -> Dict[str, Any]:
+        """Return a JSON serialisable object"""
+        return {
+            "event_type": self.event_type,
+            "handler": getattr(
+                self.handler, "__qualname__", repr(self.handler)),
+            "module": getattr(self.handler, "__module__", None),
+            "invocations": self.invocations,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "mean_time": (self.total_time / self.invocations
+                          if self.invocations else 0.0),
+            "exceptions": self.exceptions
+        }
+
+
+# pylint: disable=too-many-instance-attributes
+class HandlerQueue:
+    """
+    Bounded queue limiting the concurrency of an event handler
+
+    Overflow policies when max_queue events are waiting:
+    drop-oldest: The oldest waiting event is dropped
+    coalesce: The event is merged into a waiting event for the same item,
+              batches are merged per item. Otherwise drops the oldest.
+    block: put_wait waits until there is space in the queue,
+           plain put (used by broadcast) drops the oldest event instead
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 handler: Callable,
+                 loop: asyncio.AbstractEventLoop,
+                 max_concurrency: int = 1,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 overflow: str = OVERFLOW_DROP_OLDEST) -> None:
+        assert overflow in OVERFLOW_POLICIES
+        self.handler = handler
+        self.loop = loop
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.pending: Deque[Tuple[Event, dict, List[asyncio.Future]]] = (
+            deque())
+        self.running = 0
+        self.queued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+        self.stats: Optional[HandlerStats] = None
+        # Producers of put_wait waiting for space in the queue
+        self._space_waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def depth(self) -> int:
+        """The number of waiting events"""
+        return len(self.pending)
+
+    @property
+    def full(self) -> bool:
+        """Whether a new event would overflow the queue"""
+        return (self.running >= self.max_concurrency
+                and len(self.pending) >= self.max_queue)
+
+    def dump(self) -> Dict[str, Any]:
+        """Return a JSON serialisable object"""
+        return {
+            "depth": self.depth,
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "overflow": self.overflow,
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "blocked": self.blocked
+        }
+
+    def put(self, event: Event, **kwargs) -> asyncio.Future:
+        """
+        Queues an event
+
+        Returns a future that resolves with the handler's result
+        or None if the event has been dropped
+        """
+        future = self.loop.create_future()
+        if self.running < self.max_concurrency:
+            self.running += 1
+            self.loop.create_task(self._worker(event, kwargs, [future]))
+            return future
+
+        if len(self.pending) >= self.max_queue:
+            if (self.overflow == OVERFLOW_COALESCE
+                    and self._coalesce(event, kwargs, future)):
+                self.coalesced += 1
+                return future
+            _, _, dropped_futures = self.pending.popleft()
+            self.dropped += 1
+            for dropped_future in dropped_futures:
+                if not dropped_future.done():
+                    dropped_future.set_result(None)
+
+        self.queued += 1
+        self.pending.append((event, kwargs, [future]))
+        return future
+
+    async def put_wait(self, event: Event, **kwargs) -> asyncio.Future:
+        """
+        Queues an event, with the block policy it first waits
+        until there is space in the queue
+
+        Returns the future of put
+        """
+        if self.overflow == OVERFLOW_BLOCK and self.full:
+            self.blocked += 1
+            while self.full:
+                waiter = self.loop.create_future()
+                self._space_waiters.append(waiter)
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    # Pass a wakeup that was meant for this producer on
+                    if waiter.done() and not waiter.cancelled():
+                        self._wake_producer()
+                    raise
+        return self.put(event, **kwargs)
+
+    def _wake_producer(self) -> None:
+        """Wakes the first producer waiting for space"""
+        while self._space_waiters:
+            waiter = self._space_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _coalesce(
+            self, event: Event, kwargs: dict, future: asyncio.Future) -> bool:
+        """Merges an event into a waiting one"""
+        for index in range(len(self.pending) - 1, -1, -1):
+            pending_event, pending_kwargs, futures = self.pending[index]
+            if pending_event.event_type != event.event_type:
+                continue
+            if "batch" in kwargs and "batch" in pending_kwargs:
+                merged = dict(pending_kwargs["batch"])
+                for item, changes in kwargs["batch"]:
+                    merged[item] = {**merged.get(item, {}), **changes}
+                kwargs = {**kwargs, "batch": list(merged.items())}
+            elif ("item" in kwargs
+                  and pending_kwargs.get("item") is kwargs["item"]):
+                if "changes" in kwargs:
+                    kwargs = {**kwargs, "changes": {
+                        **pending_kwargs.get("changes", {}),
+                        **kwargs["changes"]}}
+            else:
+                continue
+            futures.append(future)
+            self.pending[index] = (event, kwargs, futures)
+            return True
+        return False
+
+    async def _worker(
+            self, event: Event, kwargs: dict,
+            futures: List[asyncio.Future]) -> None:
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    result = await self.handler(event, **kwargs)
+                except Exception as error:  # pylint: disable=broad-except
+                    if self.stats:
+                        self.stats.exceptions += 1
+                    LOGGER.error("Error in event handler %s for event %s",
+                                 self.handler, event.event_type,
+                                 exc_info=True)
+                    for future in futures:
+                        # Callers may have cancelled their future
+                        if not future.done():
+                            future.set_exception(error)
+                else:
+                    for future in futures:
+                        if not future.done():
+                            future.set_result(result)
+                if self.stats:
+                    self.stats.record(time.perf_counter() - start)
+                if not self.pending:
+                    return
+                event, kwargs, futures = self.pending.popleft()
+                self._wake_producer()
+        finally:
+            self.running -= 1
+            self._wake_producer()
+
+
+# pylint: disable=too-many-instance-attributes
 class EventBus:
     """Dispatcher for events"""
 
     def __init__(self, core) -> None:
         self.core = core
         self.handlers = defaultdict(set)
+        # Handlers that are plain callables and run inline
+        self.sync_handlers = defaultdict(set)
+        # Handlers with limited concurrency
+        self.handler_queues: Dict[Tuple[str, Callable], HandlerQueue] = {}
+        # Precomputed (sync, async) handler tuples per event type
+        # including the global "*" handlers for flat event types
+        # and the matching patterns for hierarchical ones
+        self.dispatch_table: Dict[str, HandlerTuples] = {}
+        self.global_handlers: HandlerTuples = NO_HANDLERS
+        self.patterns = EventPatternTrie()
+        self.has_hierarchical_handlers = False
+        self._pattern_cache: Dict[str, HandlerTuples] = {}
+        # Handler statistics, only recorded if record_stats is set
+        self.record_stats = False
+        self.stats: Dict[Tuple[str, Callable], HandlerStats] = {}
+        # Handlers receiving lists of (item, changes) pairs
+        self.batch_handlers = defaultdict(set)
+        self.coalesce_state_changes = False
+        self.coalesce_window = 0.0
+        self._pending_state_changes: Dict["Item", dict] = {}
+        self._flush_handle: Optional[asyncio.Handle] = None
+
+    async def init(self) -> None:
+        """Loads the configuration"""
+        cfg = await self.core.cfg.register_domain(
+            "event-bus", schema=CONFIG_SCHEMA)
+        self.coalesce_state_changes = cfg["coalesce-state-changes"]
+        self.coalesce_window = cfg["coalesce-window"]
+        self.set_record_stats(cfg["record-stats"])
+
+    def set_record_stats(self, record_stats: bool) -> None:
+        """Enables or disables the recording of handler statistics"""
+        if record_stats == self.record_stats:
+            return
+        self.record_stats = record_stats
+        self.global_handlers = self._split_handlers("*")
+        self._pattern_cache.clear()
+        for event_type in tuple(self.dispatch_table):
+            self._rebuild_entry(event_type)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Returns the handler statistics sorted by total time"""
+        result = []
+        for (event_type, handler), stats in self.stats.items():
+            handler_queue = self.handler_queues.get((event_type, handler))
+            result.append({
+                **stats.dump(),
+                "queue": handler_queue.dump() if handler_queue else None
+            })
+        return sorted(
+            result, key=lambda entry: entry["total_time"], reverse=True)
+
+    def _get_stats(self, event_type: str, handler: Callable) -> HandlerStats:
+        stats = self.stats.get((event_type, handler))
+        if not stats:
+            stats = self.stats[(event_type, handler)] = HandlerStats(
+                event_type, handler)
+        return stats
 
     @staticmethod
     def create_event(event_type: str,
@@ -47,36 +463,263 @@ class EventBus:
         data.update(kwargs)
         return Event(event_type, data=data, timestamp=datetime.utcnow())
 
-    def get_event_handlers(self, event: Event) -> List:
+    def get_event_handlers(self, event: Event) -> Tuple[Callable, ...]:
+        """
+        Returns the handlers for an Event
+        """
+        return self.get_handlers(event.event_type)
+
+    def get_handlers(self, event_type: str) -> Tuple[Callable, ...]:
+        """
+        Returns the handlers for an event type
+        """
+        sync_handlers, async_handlers = self._lookup(event_type)
+        return sync_handlers + async_handlers
+
+    def _lookup(self, event_type: str) -> HandlerTuples:
+        handlers = self.dispatch_table.get(event_type)
+        if handlers is not None:
+            return handlers
+        if "." not in event_type:
+            return self.global_handlers
+        if not self.patterns:
+            return NO_HANDLERS
+
+        handlers = self._pattern_cache.get(event_type)
+        if handlers is None:
+            if len(self._pattern_cache) >= MAX_PATTERN_CACHE:
+                self._pattern_cache.clear()
+            handlers = self._pattern_cache[event_type] = (
+                self._match_patterns(event_type))
+        return handlers
+
+    def _match_patterns(self, event_type: str) -> HandlerTuples:
+        sync_handlers: Tuple[Callable, ...] = ()
+        async_handlers: Tuple[Callable, ...] = ()
+        for pattern in self.patterns.match(event_type):
+            pattern_sync, pattern_async = self._split_handlers(pattern)
+            sync_handlers += pattern_sync
+            async_handlers += pattern_async
+        return sync_handlers, async_handlers
+
+    def _rebuild_dispatch_table(self, event_type: str) -> None:
         """
-        Returns a list of handlers for an Event
+        Rebuilds the handler tuples affected by a change to event_type
         """
+        if is_pattern(event_type):
+            if self.handlers.get(event_type):
+                self.patterns.add(event_type)
+            else:
+                self.handlers.pop(event_type, None)
+                self.patterns.remove(event_type)
+            self._pattern_cache.clear()
+            for key in tuple(self.dispatch_table):
+                if "." in key:
+                    self._rebuild_entry(key)
+        elif event_type == "*":
+            self.global_handlers = self._split_handlers("*")
+            for key in tuple(self.dispatch_table):
+                if "." not in key:
+                    self._rebuild_entry(key)
+        else:
+            self._rebuild_entry(event_type)
+
+        self.has_hierarchical_handlers = bool(self.patterns) or any(
+            "." in key for key in self.dispatch_table)
+
+    def _split_handlers(
+            self, event_type: str,
+            stats_event_type: Optional[str] = None) -> HandlerTuples:
+        handlers = self.handlers.get(event_type, ())
+        sync_handlers = self.sync_handlers.get(event_type, ())
+        stats_event_type = stats_event_type or event_type
         return (
-            list(self.handlers.get("*", list()))
-            + list(self.handlers.get(event.event_type, list()))
+            tuple(self._get_callable(event_type, handler, stats_event_type)
+                  for handler in handlers
+                  if handler in sync_handlers),
+            tuple(self._get_callable(event_type, handler, stats_event_type)
+                  for handler in handlers
+                  if handler not in sync_handlers)
         )
 
+    def _get_callable(
+            self, event_type: str, handler: Callable,
+            stats_event_type: Optional[str] = None) -> Callable:
+        """
+        Returns the callable to dispatch an event to a handler registered
+        for event_type, recording statistics for stats_event_type
+        """
+        handler_queue = self.handler_queues.get((event_type, handler))
+        if handler_queue:
+            handler_queue.stats = (
+                self._get_stats(event_type, handler)
+                if self.record_stats else None)
+            return handler_queue.put
+        if not self.record_stats:
+            return handler
+        stats = self._get_stats(stats_event_type or event_type, handler)
+        if handler in self.sync_handlers.get(event_type, ()):
+            return stats.wrap_sync(handler)
+        return stats.wrap(handler)
+
+    def _rebuild_entry(self, event_type: str) -> None:
+        if not self.handlers.get(event_type):
+            self.handlers.pop(event_type, None)
+            self.dispatch_table.pop(event_type, None)
+            return
+        if "." in event_type:
+            base_sync, base_async = self._match_patterns(event_type)
+        elif self.record_stats:
+            base_sync, base_async = self._split_handlers("*", event_type)
+        else:
+            base_sync, base_async = self.global_handlers
+        sync_handlers, async_handlers = self._split_handlers(event_type)
+        self.dispatch_table[event_type] = (
+            base_sync + sync_handlers,
+            base_async + async_handlers)
+
     def broadcast(self,  # lgtm [py/similar-function]
                   event_type: str,
                   data: dict = None,
-                  **kwargs) -> List[asyncio.Future]:
+                  **kwargs) -> Sequence[asyncio.Future]:
         """
         Broadcast an event and return the futures
 
         Every listener is a coroutine that will simply
-        receive event and `kwargs`
+        receive event and `kwargs`.
+        Synchronous listeners are called inline and have no future.
 
         Example:
         >>> async def on_event(event: Event, ...):
         >>>     return
         """
+        sync_handlers, async_handlers = self._lookup(event_type)
+        if not sync_handlers and not async_handlers:
+            return ()
+
         event = self.create_event(event_type, data, **kwargs)
 
         LOGGER.debug("Event: %s", event)
 
+        for handler in sync_handlers:
+            self._run_sync_handler(handler, event, kwargs)
+
         return [asyncio.ensure_future(
             handler(event, **kwargs),
-            loop=self.core.loop) for handler in self.get_event_handlers(event)]
+            loop=self.core.loop) for handler in async_handlers]
+
+    async def broadcast_wait(self,
+                             event_type: str,
+                             data: dict = None,
+                             **kwargs) -> Sequence[asyncio.Future]:
+        """
+        Broadcast an event like broadcast but wait for space
+        in the queues of handlers registered with the block policy
+        """
+        sync_handlers, async_handlers = self._lookup(event_type)
+        if not sync_handlers and not async_handlers:
+            return ()
+
+        event = self.create_event(event_type, data, **kwargs)
+
+        LOGGER.debug("Event: %s", event)
+
+        for handler in sync_handlers:
+            self._run_sync_handler(handler, event, kwargs)
+
+        futures = []
+        for handler in async_handlers:
+            handler_queue = getattr(handler, "__self__", None)
+            if isinstance(handler_queue, HandlerQueue):
+                futures.append(
+                    await handler_queue.put_wait(event, **kwargs))
+            else:
+                futures.append(asyncio.ensure_future(
+                    handler(event, **kwargs), loop=self.core.loop))
+        return futures
+
+    @staticmethod
+    def _run_sync_handler(
+            handler: Callable, event: Event, kwargs: dict) -> None:
+        try:
+            handler(event, **kwargs)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.error("Error in event handler %s for event %s",
+                         handler, event.event_type, exc_info=True)
+
+    def broadcast_item_event(
+            self, event_type: str, item: "Item",
+            **kwargs) -> Sequence[asyncio.Future]:
+        """
+        Broadcasts an item event as event_type
+        and as item.<event_type>.<unique_identifier>
+        """
+        futures = self.broadcast(event_type, item=item, **kwargs)
+        if not self.has_hierarchical_handlers:
+            return futures
+        return [*futures, *self.broadcast(
+            item_event_type(event_type, item), item=item, **kwargs)]
+
+    def broadcast_state_change(self, item: "Item", changes: dict) -> None:
+        """
+        Broadcasts a state_change event
+
+        If coalescing is enabled the changes are merged per item
+        and delivered after one loop tick or the configured window.
+        Batch handlers receive every (item, changes) pair in a single call.
+        """
+        if (self._lookup(EVENT_STATE_CHANGE) == NO_HANDLERS
+                and not self.has_hierarchical_handlers
+                and not self.batch_handlers.get(EVENT_STATE_CHANGE)):
+            return
+
+        if not self.coalesce_state_changes:
+            self.broadcast_item_event(
+                EVENT_STATE_CHANGE, item, changes=changes)
+            self._broadcast_batch([(item, changes)])
+            return
+
+        pending = self._pending_state_changes.get(item)
+        if pending is None:
+            self._pending_state_changes[item] = dict(changes)
+        else:
+            pending.update(changes)
+
+        if not self._flush_handle:
+            if self.coalesce_window:
+                self._flush_handle = self.core.loop.call_later(
+                    self.coalesce_window, self.flush_state_changes)
+            else:
+                self._flush_handle = self.core.loop.call_soon(
+                    self.flush_state_changes)
+
+    def flush_state_changes(self) -> None:
+        """Delivers the pending coalesced state changes"""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending_state_changes = (
+            self._pending_state_changes, {})
+        if not pending:
+            return
+
+        for item, changes in pending.items():
+            self.broadcast_item_event(
+                EVENT_STATE_CHANGE, item, changes=changes)
+        self._broadcast_batch(list(pending.items()))
+
+    def _broadcast_batch(
+            self, batch: List[Tuple["Item", dict]]
+    ) -> Sequence[asyncio.Future]:
+        handlers = self.batch_handlers.get(EVENT_STATE_CHANGE)
+        if not handlers:
+            return ()
+
+        event = self.create_event(EVENT_STATE_CHANGE, batch=batch)
+        return [asyncio.ensure_future(
+            self._get_callable(EVENT_STATE_CHANGE, handler)(
+                event, batch=batch),
+            loop=self.core.loop) for handler in tuple(handlers)]
 
     async def gather(self,
                      event_type: str,
@@ -85,21 +728,91 @@ class EventBus:
                      **kwargs) -> Union[List[Any], Tuple[Any]]:
         """
         Broadcast an event and return the results
+        of the coroutine handlers
         """
         tasks = self.broadcast(event_type, data, **kwargs)
         if not tasks:
             return []
         return await asyncio.gather(*tasks, loop=self.core.loop)
 
-    def register(self, event: str) -> Callable:
+    # pylint: disable=too-many-arguments
+    def register(
+            self, event: str, batch: bool = False,
+            sync: bool = False,
+            max_concurrency: Optional[int] = None,
+            max_queue: Optional[int] = None,
+            overflow: str = OVERFLOW_DROP_OLDEST) -> Callable:
         """
         Decorator to register event handlers
+
+        Hierarchical event types are separated by dots and can be
+        subscribed to with wildcards, see EventPatternTrie.
+        Item events are also broadcasted as item.<event_type>.<identifier>:
+        >>> @event_bus.register("item.state_change.*")
+        >>> async def on_state_change(event: Event, item, changes):
+        >>>     return
+
+        sync handlers are plain callables that are run inline
+        without creating a task. They should never block.
+        >>> def on_event(event: Event, ...):
+        >>>     return
+
+        batch handlers are only supported for state_change events
+        and receive a list of (item, changes) pairs:
+        >>> async def on_state_changes(event: Event, batch: list):
+        >>>     return
+
+        If max_concurrency or max_queue is given for a coroutine handler
+        at most max_concurrency invocations run at once and up to max_queue
+        events wait. The overflow policy decides what happens beyond that.
+        The block policy only holds back producers using broadcast_wait.
+        sync handlers can't be queued.
         """
+        if batch and event != EVENT_STATE_CHANGE:
+            raise ValueError(
+                f"batch handlers are only supported for {EVENT_STATE_CHANGE}")
+        if sync and (max_concurrency or max_queue):
+            raise ValueError(
+                "max_concurrency and max_queue are not supported "
+                "for sync handlers")
+
         def _register(coro):
+            self.handler_queues.pop((event, coro), None)
+            if not sync and (max_concurrency or max_queue):
+                self.handler_queues[(event, coro)] = HandlerQueue(
+                    coro, self.core.loop,
+                    max_concurrency=max_concurrency or 1,
+                    max_queue=max_queue or DEFAULT_MAX_QUEUE,
+                    overflow=overflow)
+            if batch:
+                self.batch_handlers[event].add(coro)
+                return coro
             self.handlers[event].add(coro)
+            if sync:
+                self.sync_handlers[event].add(coro)
+            else:
+                self.sync_handlers.get(event, set()).discard(coro)
+            self._rebuild_dispatch_table(event)
             return coro
         return _register
 
     def remove_handler(self, event: str, handler: Callable) -> None:
         """Removes an event handler"""
-        self.handlers[event].discard(handler)
+        self.handler_queues.pop((event, handler), None)
+        self.stats.pop((event, handler), None)
+        self.batch_handlers.get(event, set()).discard(handler)
+        if handler in self.handlers.get(event, ()):
+            self.handlers[event].discard(handler)
+            self.sync_handlers[event].discard(handler)
+            self._rebuild_dispatch_table(event)
+        if not self._is_registered(handler):
+            # Global and pattern handlers have stats per matched event type
+            for key in [key for key in self.stats if key[1] == handler]:
+                del self.stats[key]
+
+    def _is_registered(self, handler: Callable) -> bool:
+        """Checks if a handler is registered for any event"""
+        return any(
+            handler in handlers
+            for handlers in (*self.handlers.values(),
+                             *self.batch_handlers.values()))
@@ -1,17 +1,23 @@
 """ItemManager for HomeControl"""
 import asyncio
 import logging
+from collections import defaultdict
 from inspect import isclass
-from typing import Any, TYPE_CHECKING, Dict, Iterator, List, Optional, cast
+from typing import (Any, TYPE_CHECKING, Callable, Dict, Iterator, List,
+                    Optional, cast)
 
 import voluptuous as vol
 from attr import asdict, attrib, attrs
 
 from homecontrol.const import (EVENT_ITEM_CREATED, EVENT_ITEM_NOT_WORKING,
-                               EVENT_ITEM_REMOVED, ItemStatus)
+                               EVENT_ITEM_REMOVED, EVENT_ITEM_STARTUP_COMPLETE,
+                               EVENT_ITEM_STARTUP_PROGRESS,
+                               EVENT_ITEM_STATUS_CHANGED, POLL_IDLE_TIMEOUT,
+                               ItemStatus)
 from homecontrol.dependencies.entity_types import Item, ItemProvider, Module
+from homecontrol.dependencies.event_bus import Event
 from homecontrol.dependencies.linter_friendly_attrs import LinterFriendlyAttrs
-from homecontrol.dependencies.storage import Storage
+from homecontrol.dependencies.storage import DictWrapper, Storage
 
 if TYPE_CHECKING:
     from homecontrol.core import Core
@@ -25,10 +31,21 @@ CONFIG_SCHEMA = vol.Schema([
         vol.Optional("name"): str,
         vol.Optional("cfg"): dict,
         vol.Required("states", default={}): dict,
-        vol.Required("enabled", default=True): bool
+        vol.Required("enabled", default=True): bool,
+        vol.Required("lazy", default=False): bool
     }, extra=vol.ALLOW_EXTRA)
 ])
 
+STARTUP_SCHEMA = vol.Schema({
+    vol.Required("max-concurrency", default=16): vol.All(
+        vol.Coerce(int), vol.Range(min=1)),
+    vol.Required("provider-concurrency", default=4): vol.All(
+        vol.Coerce(int), vol.Range(min=1)),
+    vol.Required("providers", default={}): {
+        str: vol.All(vol.Coerce(int), vol.Range(min=1))
+    }
+})
+
 
 # pylint: disable=too-few-public-methods
 @attrs(slots=True)
@@ -44,6 +61,8 @@ class StorageEntry(LinterFriendlyAttrs):
     hidden: bool = attrib(default=False)
     provider: str = attrib(default=None)
     yaml: bool = attrib(default=False)
+    # Only create the item on first access
+    lazy: bool = attrib(default=False)
 
     def __attrs_post_init__(self):
         self.identifier = self.identifier or self.unique_identifier
@@ -56,7 +75,7 @@ def yaml_entry_to_storage_entry(yaml_entry: dict) -> StorageEntry:
         cfg = yaml_entry["cfg"]
     else:
         cfg = yaml_entry.copy()
-        for key in ("id", "type", "name", "states", "enabled"):
+        for key in ("id", "type", "name", "states", "enabled", "lazy"):
             cfg.pop(key, None)
     return StorageEntry(
         cfg=cfg,
@@ -67,46 +86,157 @@ def yaml_entry_to_storage_entry(yaml_entry: dict) -> StorageEntry:
         state_defaults=yaml_entry["states"],
         name=yaml_entry.get("name", yaml_entry["id"]),
         hidden=False,
-        yaml=True
+        yaml=True,
+        lazy=yaml_entry["lazy"]
     )
 
 
+def _item_filters(
+        item_type: Optional[str] = None,
+        implements: Optional[str] = None,
+        module: Optional[str] = None,
+        status: Optional[ItemStatus] = None) -> Dict[str, Any]:
+    """Returns the given filters of query by the item field they match"""
+    return {
+        name: value for name, value in (
+            ("type", item_type),
+            ("implements", implements),
+            ("module", module),
+            ("status", status))
+        if value is not None
+    }
+
+
+def _remove_from_index(
+        index: Dict[Any, Dict[str, Item]], key: Any, identifier: str) -> None:
+    """Removes an item from an index and drops empty keys"""
+    bucket = index.get(key)
+    if bucket is None:
+        return
+    bucket.pop(identifier, None)
+    if not bucket:
+        del index[key]
+
+
+# pylint: disable=too-many-instance-attributes,too-many-public-methods
 class ItemManager:
     """
     ItemManager manages all your stateful items
+
+    Besides items, which is keyed by identifier, the items are indexed
+    by unique identifier and by type, implemented type, module and status
+    for query
+
+    Lazy storage entries are only turned into items on first access
+    through ensure_item, until then they are described by describe_lazy
+
+    version changes whenever items are added, removed or change status
     """
     core: "Core"
+    version: int
     items: Dict[str, Item]
+    by_unique_identifier: Dict[str, Item]
+    by_type: Dict[str, Dict[str, Item]]
+    by_implements: Dict[str, Dict[str, Item]]
+    by_module: Dict[str, Dict[str, Item]]
+    by_status: Dict[ItemStatus, Dict[str, Item]]
     yaml_cfg: List[dict]
+    startup_cfg: dict
     item_config: Dict[str, StorageEntry]
 
     def __init__(self, core: "Core"):
         self.core = core
+        self.version = 0
         self.items = {}
+        self.by_unique_identifier = {}
+        self.by_type = defaultdict(dict)
+        self.by_implements = defaultdict(dict)
+        self.by_module = defaultdict(dict)
+        self.by_status = defaultdict(dict)
+        self._indexed_status: Dict[str, ItemStatus] = {}
+        # Index keys of every item when it was indexed, implements may change
+        self._indexed_keys: Dict[str, List[tuple]] = {}
+        # Lazy storage entries by unique identifier and identifier
+        self.lazy_entries: Dict[str, StorageEntry] = {}
+        self._lazy_identifiers: Dict[str, str] = {}
+        self._materializing: Dict[str, asyncio.Future] = {}
         self.item_constructors = {}
+        # Callables telling if a consumer is subscribed to an item
+        self.watch_checks: List[Callable[[Item], bool]] = []
         self.storage = Storage(
             "items", 1,
             core=self.core,
             storage_init=lambda: {},
             loader=self._load_items,
-            dumper=self._dump_items
+            dumper=self._dump_items,
+            journal=True
         )
-        self.item_config = self.storage.load_data()
+        self.item_config = DictWrapper(self.storage)
+        self.core.event_bus.register(
+            EVENT_ITEM_STATUS_CHANGED, sync=True)(self._on_status_change)
 
     async def init(self) -> None:
         """Initialise the items from configuration"""
         self.yaml_cfg = cast(List[dict], await self.core.cfg.register_domain(
             "items", schema=CONFIG_SCHEMA, default=[]))
+        self.startup_cfg = await self.core.cfg.register_domain(
+            "item-startup", schema=STARTUP_SCHEMA)
         self.load_yaml_config()
         self.core.loop.create_task(self.init_from_storage())
 
     async def init_from_storage(self) -> None:
-        """Initializes the items configured in the storage"""
-        await asyncio.gather(*(
-            self.create_from_storage_entry(storage_entry)
-            for storage_entry in self.item_config.values()
-            if storage_entry.enabled
-        ))
+        """
+        Initializes the items configured in the storage
+
+        At most max-concurrency items are created at the same time
+        and at most provider-concurrency per provider module.
+        Progress is broadcast as item_startup_progress events
+        """
+        entries = []
+        for storage_entry in self.item_config.values():
+            if not storage_entry.enabled:
+                continue
+            if self._is_lazy(storage_entry):
+                self._add_lazy_entry(storage_entry)
+            else:
+                entries.append(storage_entry)
+        total = len(entries)
+        done = 0
+        start = self.core.loop.time()
+        limit = asyncio.Semaphore(self.startup_cfg["max-concurrency"])
+        provider_limits: Dict[str, asyncio.Semaphore] = {}
+
+        async def _create(storage_entry: StorageEntry) -> None:
+            nonlocal done
+            provider = (storage_entry.provider
+                        or storage_entry.type.split(".", 1)[0])
+            if provider not in provider_limits:
+                provider_limits[provider] = asyncio.Semaphore(
+                    self.startup_cfg["providers"].get(
+                        provider, self.startup_cfg["provider-concurrency"]))
+
+            # The provider limit is acquired first
+            # to not block other providers
+            async with provider_limits[provider], limit:
+                item_start = self.core.loop.time()
+                item = await self.create_from_storage_entry(storage_entry)
+                duration = self.core.loop.time() - item_start
+
+            done += 1
+            self.core.event_bus.broadcast(
+                EVENT_ITEM_STARTUP_PROGRESS,
+                unique_identifier=storage_entry.unique_identifier,
+                item=item, duration=duration, done=done, total=total)
+
+        await asyncio.gather(*(_create(entry) for entry in entries))
+
+        duration = self.core.loop.time() - start
+        online = len(self.by_status.get(ItemStatus.ONLINE, ()))
+        self.core.event_bus.broadcast(
+            EVENT_ITEM_STARTUP_COMPLETE,
+            duration=duration, total=total, online=online)
+        LOGGER.info("Initialised %s items in %.2fs, %s are online",
+                    total, duration, online)
 
     def load_yaml_config(self) -> None:
         """Loads the YAML configuration to the storage"""
@@ -118,6 +248,7 @@ class ItemManager:
             storage_entry = yaml_entry_to_storage_entry(yaml_entry)
             self.item_config[
                 storage_entry.unique_identifier] = storage_entry
+        # One snapshot instead of a journal record per entry
         self.storage.schedule_save(self.item_config)
 
     def get_storage_entry(
@@ -128,7 +259,6 @@ class ItemManager:
     def update_storage_entry(self, entry: StorageEntry) -> None:
         """Updates a config storage entry"""
         self.item_config[entry.unique_identifier] = entry
-        self.storage.schedule_save(self.item_config)
 
     def _load_items(self, data: dict) -> dict:  # pylint: disable=no-self-use
         entries = {}
@@ -156,6 +286,7 @@ class ItemManager:
                     and item_class.__module__ == mod_obj.name):
                 item_class.module = mod_obj
                 item_class.type = f"{mod_obj.name}.{item_class.__name__}"
+                item_class.reset_implements()
                 self.item_constructors[
                     item_class.type] = item_class.constructor
 
@@ -165,25 +296,187 @@ class ItemManager:
             if identifier in self.items:
                 yield self.items[identifier]
 
+    def query(self,
+              item_type: Optional[str] = None,
+              implements: Optional[str] = None,
+              module: Optional[str] = None,
+              status: Optional[ItemStatus] = None) -> List[Item]:
+        """Returns the items matching every given filter"""
+        indexes = {
+            "type": self.by_type,
+            "implements": self.by_implements,
+            "module": self.by_module,
+            "status": self.by_status
+        }
+        buckets = [
+            indexes[name].get(value, {}) for name, value in _item_filters(
+                item_type, implements, module, status).items()
+        ]
+        if not buckets:
+            return list(self.items.values())
+        smallest, *others = sorted(buckets, key=len)
+        return [
+            item for identifier, item in smallest.items()
+            if all(identifier in bucket for bucket in others)
+        ]
+
+    def _index_keys(self, item: Item) -> Iterator[tuple]:
+        yield self.by_type, item.type
+        yield self.by_module, getattr(item.module, "name", None)
+        for item_type in item.implements:
+            yield self.by_implements, item_type
+
+    def _index_item(self, item: Item) -> None:
+        self.version += 1
+        self.by_unique_identifier[item.unique_identifier] = item
+        keys = self._indexed_keys[item.identifier] = list(
+            self._index_keys(item))
+        for index, key in keys:
+            index[key][item.identifier] = item
+        self._index_status(item)
+
+    def _unindex_item(self, item: Item) -> None:
+        self.version += 1
+        if self.by_unique_identifier.get(item.unique_identifier) is item:
+            del self.by_unique_identifier[item.unique_identifier]
+        for index, key in self._indexed_keys.pop(item.identifier, ()):
+            _remove_from_index(index, key, item.identifier)
+        status = self._indexed_status.pop(item.identifier, None)
+        if status is not None:
+            _remove_from_index(self.by_status, status, item.identifier)
+
+    def _index_status(self, item: Item) -> None:
+        previous = self._indexed_status.get(item.identifier)
+        if previous is item.status:
+            return
+        self.version += 1
+        if previous is not None:
+            _remove_from_index(self.by_status, previous, item.identifier)
+        self.by_status[item.status][item.identifier] = item
+        self._indexed_status[item.identifier] = item.status
+
+    def _on_status_change(self, event: Event, item: Item, **kwargs) -> None:
+        if self.items.get(item.identifier) is item:
+            self._index_status(item)
+
     def get_by_unique_identifier(
             self, unique_identifier: str) -> Optional[Item]:
         """Returns an item by its unique identifier"""
-        for item in self.items.values():
-            if item.unique_identifier == unique_identifier:
-                return item
+        return self.by_unique_identifier.get(unique_identifier)
+
+    def is_watched(self, item: Item) -> bool:
+        """
+        Returns whether an item was read recently
+        or a consumer is subscribed to it
+        """
+        if self.core.loop.time() - item.states.last_read < POLL_IDLE_TIMEOUT:
+            return True
+        return any(check(item) for check in self.watch_checks)
 
     def get_item(self, identifier: str) -> Optional[Item]:
         """Returns an item by identifier or unique_identifier"""
         return (self.items.get(identifier, None)
                 or self.get_by_unique_identifier(identifier))
 
+    @staticmethod
+    def _is_lazy(storage_entry: StorageEntry) -> bool:
+        # Provider modules construct their items themselves
+        return storage_entry.lazy and not storage_entry.provider
+
+    def _add_lazy_entry(self, storage_entry: StorageEntry) -> None:
+        self.version += 1
+        self.lazy_entries[storage_entry.unique_identifier] = storage_entry
+        self._lazy_identifiers[
+            storage_entry.identifier] = storage_entry.unique_identifier
+
+    def _remove_lazy_entry(self, storage_entry: StorageEntry) -> None:
+        self.version += 1
+        self.lazy_entries.pop(storage_entry.unique_identifier, None)
+        if (self._lazy_identifiers.get(storage_entry.identifier)
+                == storage_entry.unique_identifier):
+            del self._lazy_identifiers[storage_entry.identifier]
+
+    async def ensure_item(self, identifier: str) -> Optional[Item]:
+        """
+        Returns an item by identifier or unique_identifier
+        and creates it first if its storage entry is lazy
+        """
+        item = self.get_item(identifier)
+        if item:
+            return item
+
+        unique_identifier = self._lazy_identifiers.get(identifier, identifier)
+        storage_entry = self.lazy_entries.get(unique_identifier)
+        if not storage_entry:
+            return None
+
+        future = self._materializing.get(unique_identifier)
+        if not future:
+            future = self._materializing[unique_identifier] = (
+                asyncio.ensure_future(self._materialize(storage_entry)))
+        return await asyncio.shield(future)
+
+    async def _materialize(
+            self, storage_entry: StorageEntry) -> Optional[Item]:
+        try:
+            LOGGER.debug("Creating lazy item %s", storage_entry.identifier)
+            item = await self.create_from_storage_entry(storage_entry)
+            # A failed item stays lazy so that it can be retried
+            if item:
+                self._remove_lazy_entry(storage_entry)
+            return item
+        finally:
+            del self._materializing[storage_entry.unique_identifier]
+
+    def describe_lazy(self,
+                      item_type: Optional[str] = None,
+                      implements: Optional[str] = None,
+                      module: Optional[str] = None,
+                      status: Optional[ItemStatus] = None) -> List[dict]:
+        """
+        Describes the lazy items matching the filters
+        from their storage entries and item classes
+        """
+        filters = _item_filters(item_type, implements, module, status)
+        if filters.pop("status", ItemStatus.LAZY) is not ItemStatus.LAZY:
+            return []
+        result = []
+        for storage_entry in self.lazy_entries.values():
+            constructor = self.item_constructors.get(storage_entry.type)
+            item_class = getattr(constructor, "__self__", None)
+            item_module = storage_entry.type.split(".", 1)[0]
+            item_implements = (item_class.get_implements() if item_class
+                               else [storage_entry.type])
+            fields = {"type": storage_entry.type, "module": item_module}
+            if not all(value in item_implements if name == "implements"
+                       else fields[name] == value
+                       for name, value in filters.items()):
+                continue
+            result.append({
+                "identifier": storage_entry.identifier,
+                "unique_identifier": storage_entry.unique_identifier,
+                "name": storage_entry.name,
+                "type": storage_entry.type,
+                "module": item_module,
+                "status": ItemStatus.LAZY.value,
+                "actions": [
+                    name for name, _ in getattr(item_class, "action_defs", ())
+                ],
+                "implements": item_implements,
+                "metadata": {}
+            })
+        return result
+
     async def stop_item(
             self, item: Item, status: ItemStatus = ItemStatus.STOPPED) -> None:
         """Stops an item"""
         await item.stop()
+        item.states.stop()
         LOGGER.info("Item %s has been stopped with status %s",
                     item.identifier, status)
         item.status = status
+        if self.items.get(item.identifier) is item:
+            self._index_status(item)
 
     async def stop(self) -> None:
         """Removes every item"""
@@ -206,9 +499,10 @@ class ItemManager:
                 identifier)
             return
 
+        self._unindex_item(item)
         await self.stop_item(item)
 
-        self.core.event_bus.broadcast(EVENT_ITEM_REMOVED, item=item)
+        self.core.event_bus.broadcast_item_event(EVENT_ITEM_REMOVED, item)
         LOGGER.info("Item %s has been removed", identifier)
 
     async def create_from_storage_entry(
@@ -264,11 +558,15 @@ class ItemManager:
         if existing_item:
             await self.remove_item(existing_item.identifier)
             storage_entry.enabled = bool(existing_item)
+        if existing_entry:
+            self._remove_lazy_entry(existing_entry)
 
         self.item_config[storage_entry.unique_identifier] = storage_entry
-        self.storage.schedule_save(self.item_config)
 
         if storage_entry.enabled:
+            if self._is_lazy(storage_entry):
+                self._add_lazy_entry(storage_entry)
+                return None
             return await self.create_from_storage_entry(storage_entry)
 
     # pylint: disable=too-many-arguments,too-many-locals
@@ -297,14 +595,21 @@ class ItemManager:
 
     async def register_item(self, item: Item) -> None:
         """Registers and initialises an already HomeControl item"""
+        existing_item = self.items.get(item.identifier)
+        if existing_item:
+            self._unindex_item(existing_item)
         self.items[item.identifier] = item
+        self._index_item(item)
 
         await self.init_item(item)
+        if self.items.get(item.identifier) is item:
+            self._index_status(item)
 
-        self.core.event_bus.broadcast(EVENT_ITEM_CREATED, item=item)
+        self.core.event_bus.broadcast_item_event(EVENT_ITEM_CREATED, item)
         LOGGER.debug("Item registered: %s", item.unique_identifier)
         if item.status != ItemStatus.ONLINE:
             LOGGER.warning(
                 "Item could not be initialised: %s [%s]",
                 item.unique_identifier, item.type)
-            self.core.event_bus.broadcast(EVENT_ITEM_NOT_WORKING, item=item)
+            self.core.event_bus.broadcast_item_event(
+                EVENT_ITEM_NOT_WORKING, item)
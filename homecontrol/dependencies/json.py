@@ -1,36 +1,95 @@
-"""JSON Encoder and Decoder"""
+"""
+JSON Encoder and Decoder
+
+orjson or ujson are used when installed, otherwise the standard library.
+Pretty-printing, custom separators and other standard library options
+always use the standard library.
+"""
 
 # pylint: disable=invalid-name,too-few-public-methods,import-self
+# pylint: disable=import-outside-toplevel
 import json
+from contextlib import suppress
 from datetime import datetime
 from enum import Enum
-from functools import partial
-from typing import TYPE_CHECKING, Type, cast
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 if TYPE_CHECKING:
     from homecontrol.core import Core
 
 
+def default(o: Any) -> Any:
+    """Encodes HomeControl types"""
+    if isinstance(o, Enum):
+        return o.value
+
+    if isinstance(o, datetime):
+        return o.isoformat()
+
+    if hasattr(o, "dump"):
+        return o.dump()
+
+    raise TypeError(f"Object of type {type(o).__name__} "
+                    "is not JSON serializable")
+
+
 class JSONEncoder(json.JSONEncoder):
     """Custom JSONEncoder that also parses HomeControl types"""
 
-    def __init__(self, core: "Core", *args, **kwargs):
+    def __init__(self, *args, core: "Core" = None, **kwargs):
         self.core = core
         super().__init__(*args, **kwargs)
 
-    # pylint: disable=no-self-use,too-many-return-statements,method-hidden
+    # pylint: disable=method-hidden
     def default(self, o):
         """Encode custom types"""
-        if isinstance(o, Enum):
-            return o.value
+        return default(o)
+
+
+_ENCODER = JSONEncoder(separators=(",", ":"))
+
+BACKEND = "json"
+_fast_dumps: Optional[Callable[[Any], bytes]] = None
+loads: Callable[[str], Any] = json.loads
+
+with suppress(ImportError):
+    import orjson
+
+    # Datetimes and dataclasses are left to default
+    # so that they are encoded like with the standard library
+    _ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME
+                       | orjson.OPT_PASSTHROUGH_DATACLASS
+                       | orjson.OPT_NON_STR_KEYS)
+
+    def _orjson_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+
+    BACKEND = "orjson"
+    _fast_dumps = _orjson_dumps
+    loads = orjson.loads
+
+if not _fast_dumps:
+    with suppress(ImportError, TypeError):
+        import ujson
+
+        # Older versions of ujson don't support default
+        ujson.dumps(None, default=default)
+
+        def _ujson_dumps(obj: Any) -> bytes:
+            return ujson.dumps(
+                obj, default=default, ensure_ascii=False).encode()
 
-        if isinstance(o, datetime):
-            return o.isoformat()
+        BACKEND = "ujson"
+        _fast_dumps = _ujson_dumps
+        loads = ujson.loads
 
-        if hasattr(o, "dump"):
-            return o.dump()
 
-        return o
+def dumps_bytes(obj: Any) -> bytes:
+    """Dumps an object into compact UTF-8 encoded JSON"""
+    if _fast_dumps:
+        with suppress(TypeError, OverflowError):
+            return _fast_dumps(obj)
+    return _ENCODER.encode(obj).encode()
 
 
 def dumps(obj, *, indent=None, sort_keys=False, core: "Core" = None, **kw):
@@ -38,9 +97,14 @@ def dumps(obj, *, indent=None, sort_keys=False, core: "Core" = None, **kw):
     Dumps an object into a JSON string with support
     for HomeControl's data types
     """
+    if indent is None and not sort_keys and not kw:
+        if _fast_dumps:
+            with suppress(TypeError, OverflowError):
+                return _fast_dumps(obj).decode()
+        return _ENCODER.encode(obj)
     return json.dumps(
-        obj, cls=cast(Type[JSONEncoder], partial(JSONEncoder, core=core)),
-        indent=indent, sort_keys=sort_keys, **kw)
+        obj, cls=JSONEncoder, indent=indent, sort_keys=sort_keys,
+        core=core, **kw)
 
 
 def dump(obj, fp, *, indent=None, sort_keys=False, core: "Core" = None, **kw):
@@ -48,5 +112,5 @@ def dump(obj, fp, *, indent=None, sort_keys=False, core: "Core" = None, **kw):
     Dumps an object into a Writer with support for HomeControl's data types
     """
     return json.dump(
-        obj, fp, cls=cast(Type[JSONEncoder], partial(JSONEncoder, core=core)),
-        indent=indent, sort_keys=sort_keys, **kw)
+        obj, fp, cls=JSONEncoder, indent=indent, sort_keys=sort_keys,
+        core=core, **kw)
@@ -7,9 +7,20 @@ from aiohttp import web
 from homecontrol.dependencies import json
 
 
+def encode_body(data: Any, pretty: bool = False, core=None) -> bytes:
+    """Encodes the body of a JSON response"""
+    if pretty:
+        return json.dumps(data, indent=4, sort_keys=True, core=core).encode()
+    return json.dumps_bytes(data)
+
+
 # pylint: disable=too-many-ancestors,too-many-arguments,too-few-public-methods
 class JSONResponse(web.Response):
-    """A HTTP response for JSON data"""
+    """
+    A HTTP response for JSON data
+
+    The JSON is compact unless pretty is set
+    """
 
     def __init__(
             self,
@@ -17,11 +28,11 @@ class JSONResponse(web.Response):
             error: Optional[Union[Exception, str]] = None,
             status_code: int = 200,
             core=None,
-            headers: dict = None) -> None:
+            headers: dict = None,
+            pretty: bool = False) -> None:
 
         response = {"error": error} if error else data
 
-        super().__init__(body=json.dumps(response, indent=4, sort_keys=True,
-                                         core=core),
+        super().__init__(body=encode_body(response, pretty, core),
                          status=status_code, content_type="application/json",
                          charset="utf-8", headers=headers)
@@ -191,6 +191,7 @@ class ModuleLoader:
         mod_obj.__init__()
 
         self.core.module_manager.loaded_modules[self.mod_name] = mod_obj
+        self.core.module_manager.version += 1
         await self.core.item_manager.add_from_module(mod_obj)
         await mod_obj.init()
         LOGGER.info("Module %s loaded", self.mod_name)
@@ -199,15 +200,21 @@ class ModuleLoader:
 
 
 class ModuleManager:
-    """Manages your modules"""
+    """
+    Manages your modules
+
+    version changes whenever a module is loaded
+    """
 
     cfg: dict
+    version: int
     loaded_modules: Dict[str, Module]
     module_loaders: Dict[str, ModuleLoader]
     module_accessor: ModuleAccessor
 
     def __init__(self, core: "Core"):
         self.core = core
+        self.version = 0
         self.loaded_modules = {}
         self.module_loaders = {}
         self.module_accessor = ModuleAccessor(self)
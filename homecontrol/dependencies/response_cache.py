@@ -0,0 +1,59 @@
+"""Caches encoded responses by the version of their data"""
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Hashable, Optional, Tuple
+from uuid import uuid4
+
+from homecontrol.const import MAX_CACHED_RESPONSES
+
+
+class ResponseCache:
+    """
+    Caches encoded responses until the version they were built for changes
+
+    The ETag is derived from the cache key and the version so a matching
+    If-None-Match can be answered without building the response.
+    The epoch changes with every start as versions start from zero.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES) -> None:
+        self.epoch = uuid4().hex[:8]
+        self.max_entries = max_entries
+        # key: (etag, body)
+        self.entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+
+    def etag(self, key: str, version: Hashable) -> str:
+        """Returns the strong ETag for a key and version"""
+        digest = blake2b(
+            f"{key}\0{version}".encode(), digest_size=8).hexdigest()
+        return f'"{self.epoch}-{digest}"'
+
+    def get(self, key: str, etag: str) -> Optional[bytes]:
+        """Returns the cached body if it is still current"""
+        entry = self.entries.get(key)
+        if not entry or entry[0] != etag:
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, etag: str, body: bytes) -> None:
+        """Caches a body, the least recently used is evicted"""
+        self.entries[key] = (etag, body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks an If-None-Match header, the comparison is weak"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
@@ -0,0 +1,288 @@
+"""Poll scheduler for HomeControl"""
+
+import asyncio
+import heapq
+import logging
+import random
+import time
+from itertools import count
+from typing import (TYPE_CHECKING, Any, Awaitable, Callable, Dict, List,
+                    Optional, Set, Tuple)
+
+import voluptuous as vol
+
+from homecontrol.const import POLL_BACKOFF
+
+if TYPE_CHECKING:
+    from homecontrol.core import Core
+
+LOGGER = logging.getLogger(__name__)
+
+CONFIG_SCHEMA = vol.Schema({
+    vol.Required("max-concurrency", default=16): vol.All(
+        vol.Coerce(int), vol.Range(min=1))
+})
+
+
+# pylint: disable=too-many-instance-attributes
+class PollJob:
+    """
+    A periodic job of the PollScheduler
+
+    Aligned jobs run at multiples of their interval in wall clock time,
+    jitter delays every run by up to that many seconds.
+    A run is skipped if the previous one is still running.
+    Jobs with a max_interval are adaptive, their interval ranges
+    from min_interval to max_interval.
+    """
+    __slots__ = ("name", "callback", "interval", "min_interval",
+                 "max_interval", "jitter", "align", "next_run", "running",
+                 "cancelled", "runs", "skipped", "exceptions", "total_time",
+                 "max_time", "last_run")
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 name: str,
+                 callback: Callable[[], Awaitable[Any]],
+                 interval: float,
+                 jitter: float = 0,
+                 align: bool = False,
+                 max_interval: Optional[float] = None) -> None:
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.min_interval = interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.align = align
+        self.next_run = 0.0
+        self.running = False
+        self.cancelled = False
+        self.runs = 0
+        self.skipped = 0
+        self.exceptions = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_run: Optional[float] = None
+
+    def get_next_run(self, now: float) -> float:
+        """Returns the loop time of the next run"""
+        if self.align:
+            next_run = now + self.interval - time.time() % self.interval
+        else:
+            next_run = max(self.next_run + self.interval, now)
+        if self.jitter:
+            next_run += random.uniform(0, self.jitter)
+        return next_run
+
+    def record(self, duration: float) -> None:
+        """Records a run"""
+        self.runs += 1
+        self.total_time += duration
+        if duration > self.max_time:
+            self.max_time = duration
+
+    def dump(self) -> Dict[str, Any]:
+        """Return a JSON serialisable object"""
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "jitter": self.jitter,
+            "align": self.align,
+            "running": self.running,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "exceptions": self.exceptions,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "mean_time": self.total_time / self.runs if self.runs else 0.0,
+            "last_run": self.last_run
+        }
+
+
+class PollScheduler:
+    """
+    Runs periodic jobs from a single timer
+
+    Jobs are kept in a heap ordered by their next run,
+    at most max-concurrency jobs run at the same time.
+    """
+
+    def __init__(self, core: "Core") -> None:
+        self.core = core
+        self.loop = core.loop
+        self.jobs: Set[PollJob] = set()
+        self.heap: List[Tuple[float, int, PollJob]] = []
+        self._counter = count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+        self.tasks: Set[asyncio.Task] = set()
+        self.semaphore = asyncio.Semaphore(16)
+
+    async def init(self) -> None:
+        """Loads the configuration"""
+        cfg = await self.core.cfg.register_domain(
+            "scheduler", schema=CONFIG_SCHEMA)
+        self.semaphore = asyncio.Semaphore(cfg["max-concurrency"])
+
+    # pylint: disable=too-many-arguments
+    def add_job(self,
+                callback: Callable[[], Awaitable[Any]],
+                interval: float,
+                name: Optional[str] = None,
+                jitter: float = 0,
+                align: bool = False,
+                run_now: bool = True,
+                max_interval: Optional[float] = None) -> PollJob:
+        """
+        Adds a job that awaits callback every interval seconds
+
+        The first run is immediate unless run_now is False
+        or the job is aligned.
+        With max_interval the job is adaptive, see adapt
+        """
+        job = PollJob(
+            name or getattr(callback, "__qualname__", repr(callback)),
+            callback, interval, jitter=jitter, align=align,
+            max_interval=max_interval)
+        now = self.loop.time()
+        job.next_run = now
+        if run_now and not align:
+            if jitter:
+                job.next_run += random.uniform(0, jitter)
+        else:
+            job.next_run = job.get_next_run(now)
+        self.jobs.add(job)
+        self._push(job)
+        self._set_timer()
+        return job
+
+    def remove_job(self, job: Optional[PollJob]) -> None:
+        """Removes a job, a running callback isn't cancelled"""
+        if not job or job.cancelled:
+            return
+        job.cancelled = True
+        self.jobs.discard(job)
+
+    def set_interval(
+            self, job: PollJob, interval: float,
+            run_now: bool = False) -> None:
+        """
+        Changes the interval of a job
+
+        A shorter interval or run_now takes effect immediately,
+        a longer one after the next run
+        """
+        if job.cancelled:
+            return
+        job.interval = interval
+        now = self.loop.time()
+        next_run = now if run_now else now + interval
+        if next_run < job.next_run:
+            job.next_run = next_run
+            self._push(job)
+            self._set_timer()
+
+    def adapt(self, job: PollJob, changed: bool, watched: bool) -> None:
+        """
+        Adapts the interval of an adaptive job after a run
+
+        Unwatched jobs use max_interval, changes reset the interval
+        to min_interval and otherwise it backs off
+        """
+        if not job.max_interval:
+            return
+        if not watched:
+            interval = job.max_interval
+        elif changed:
+            interval = job.min_interval
+        else:
+            interval = min(job.interval * POLL_BACKOFF, job.max_interval)
+        if interval != job.interval:
+            self.set_interval(job, interval)
+
+    def tighten(self, job: PollJob) -> None:
+        """Resets an adaptive job to min_interval and runs it soon"""
+        if job.max_interval and job.interval > job.min_interval:
+            self.set_interval(job, job.min_interval, run_now=True)
+
+    def _push(self, job: PollJob) -> None:
+        heapq.heappush(self.heap, (job.next_run, next(self._counter), job))
+
+    def _set_timer(self) -> None:
+        """Sets the timer to the next run"""
+        # Cancelled and rescheduled entries don't need to wake the loop
+        while self.heap and (self.heap[0][2].cancelled
+                             or self.heap[0][0] != self.heap[0][2].next_run):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return
+        when = self.heap[0][0]
+        if self._timer_at is not None and self._timer_at <= when:
+            return
+        if self._timer:
+            self._timer.cancel()
+        self._timer_at = when
+        self._timer = self.loop.call_at(when, self._run_due)
+
+    def _run_due(self) -> None:
+        """Starts every job that is due and sets the timer for the next"""
+        self._timer = self._timer_at = None
+        now = self.loop.time()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            when, _, job = heapq.heappop(self.heap)
+            if not job.cancelled and when == job.next_run:
+                due.append(job)
+
+        for job in due:
+            if job.running:
+                job.skipped += 1
+            else:
+                task = self.loop.create_task(self._run_job(job))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+            job.next_run = job.get_next_run(now)
+            self._push(job)
+        self._set_timer()
+
+    async def _run_job(self, job: PollJob) -> None:
+        job.running = True
+        try:
+            async with self.semaphore:
+                if job.cancelled:
+                    return
+                start = time.perf_counter()
+                try:
+                    await job.callback()
+                except Exception:  # pylint: disable=broad-except
+                    job.exceptions += 1
+                    LOGGER.error("Error in poll job %s",
+                                 job.name, exc_info=True)
+                finally:
+                    job.record(time.perf_counter() - start)
+                    job.last_run = time.time()
+        finally:
+            job.running = False
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Returns the job statistics sorted by total time"""
+        return sorted(
+            (job.dump() for job in self.jobs),
+            key=lambda job: job["total_time"], reverse=True)
+
+    async def stop(self) -> None:
+        """Cancels the timer and the running jobs"""
+        if self._timer:
+            self._timer.cancel()
+        self._timer = self._timer_at = None
+        for job in self.jobs:
+            job.cancelled = True
+        self.jobs.clear()
+        self.heap.clear()
+        for task in self.tasks:
+            task.cancel()
+        if self.tasks:
+            await asyncio.wait(self.tasks, timeout=1)
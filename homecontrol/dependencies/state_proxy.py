@@ -2,32 +2,48 @@
 import asyncio
 import logging
 from types import MethodType
-from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union, cast
+from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Optional,
+                    Union, cast)
 
 import voluptuous as vol
 
-from homecontrol.const import ItemStatus
+from homecontrol.const import (POLL_IDLE_TIMEOUT, POLL_JITTER,
+                               STATE_DUMP_TIMEOUT, ItemStatus)
 from homecontrol.exceptions import ItemNotOnlineError
 
 if TYPE_CHECKING:
     from homecontrol.dependencies.entity_types import Item
+    from homecontrol.dependencies.scheduler import PollJob
     from homecontrol.core import Core
 
 
 LOGGER = logging.getLogger(__name__)
 
+_NO_DEFAULT = object()
+
 
 class StateDef:
-    """A state definition for automatic setup"""
+    """
+    A state definition for automatic setup
+
+    Values returned by a getter can be cached for cache_ttl seconds.
+    With max_poll_interval the poll interval backs off up to that value
+    while the state doesn't change or nobody watches the item.
+    """
 
+    # pylint: disable=too-many-arguments
     def __init__(
             self,
             poll_interval: Optional[float] = None,
             default: Any = None,
             default_factory: Callable = None,
-            log_state: bool = True) -> None:
+            log_state: bool = True,
+            cache_ttl: Optional[float] = None,
+            max_poll_interval: Optional[float] = None) -> None:
 
         self._poll_interval = poll_interval
+        self._max_poll_interval = max_poll_interval
+        self._cache_ttl = cache_ttl
         self._default = default_factory() if default_factory else default
         self.log_state = log_state
         self._getter: Optional[Callable] = None
@@ -38,7 +54,7 @@ class StateDef:
         """Decorator to register a setter"""
         def _setter_decorator(setter_method: Callable) -> Callable:
             self._setter = setter_method
-            self._schema = schema
+            self._schema = vol.Schema(schema) if schema else None
             return setter_method
         return _setter_decorator
 
@@ -53,17 +69,20 @@ class StateDef:
             self,
             state_proxy: "StateProxy",
             name: str,
-            item: "Item") -> "State":
+            item: "Item",
+            default: Any = _NO_DEFAULT) -> "State":
         """Generates a State instance and registers it to a StateProxy"""
         state = State(
             state_proxy,
-            self._default,
+            self._default if default is _NO_DEFAULT else default,
             MethodType(self._getter, item) if self._getter else None,
             MethodType(self._setter, item) if self._setter else None,
             name=name,
             poll_interval=self._poll_interval,
             schema=self._schema,
-            log_state=self.log_state
+            log_state=self.log_state,
+            cache_ttl=self._cache_ttl,
+            max_poll_interval=self._max_poll_interval
         )
         state_proxy.register_state(state)
         return state
@@ -76,7 +95,9 @@ class StateDef:
         state_def = StateDef(
             poll_interval=self._poll_interval,
             default=self._default,
-            log_state=self.log_state
+            log_state=self.log_state,
+            cache_ttl=self._cache_ttl,
+            max_poll_interval=self._max_poll_interval
         )
         # pylint: disable=protected-access
         state_def._getter = getattr(
@@ -88,7 +109,13 @@ class StateDef:
 
 
 class StateProxy:
-    """Holds the states of an item"""
+    """
+    Holds the states of an item
+
+    The StateDefs are taken from Item.state_defs
+    which is computed once per item class
+    """
+    __slots__ = ("item", "core", "states", "last_read", "poll_jobs")
 
     def __init__(
             self, item: "Item", core: "Core",
@@ -98,13 +125,16 @@ class StateProxy:
         self.item = item
         self.core = core
         self.states = {}
+        # Loop time of the last read by an API consumer
+        self.last_read = 0.0
+        # Adaptive jobs of the item that poll several states at once
+        self.poll_jobs: List["PollJob"] = []
 
-        for name in dir(item):
-            state_def: StateDef = getattr(item, name)
+        for name, state_def in item.state_defs:
             if name in state_defaults:
-                # pylint: disable=protected-access
-                state_def._default = state_defaults[name]
-            if isinstance(state_def, StateDef):
+                state_def.register_state(
+                    self, name, item, state_defaults[name])
+            else:
                 state_def.register_state(self, name, item)
 
     def register_state(self, state: "State") -> None:
@@ -124,11 +154,44 @@ class StateProxy:
         """Checks if a value is valid for a state"""
         return self.states[state].check_value(value)
 
+    def stop(self) -> None:
+        """Stops polling the states"""
+        for state in self.states.values():
+            state.stop()
+
+    def add_poll_job(self, job: "PollJob") -> None:
+        """Registers an adaptive job of the item to be tightened on reads"""
+        self.poll_jobs.append(job)
+
+    def remove_poll_job(self, job: "PollJob") -> None:
+        """Unregisters an adaptive job of the item"""
+        if job in self.poll_jobs:
+            self.poll_jobs.remove(job)
+
+    def mark_read(self) -> None:
+        """
+        Marks the states as read by a consumer
+        Adaptive polling tightens if the item was idle
+        """
+        now = self.core.loop.time()
+        idle = now - self.last_read > POLL_IDLE_TIMEOUT
+        self.last_read = now
+        if idle:
+            self.tighten_polling()
+
+    def tighten_polling(self) -> None:
+        """Resets adaptively polled states to their shortest interval"""
+        for state in self.states.values():
+            if state.poll_job:
+                self.core.scheduler.tighten(state.poll_job)
+        for job in self.poll_jobs:
+            self.core.scheduler.tighten(job)
+
     def update(self, state: str, value) -> bool:
         """Called from an item to update its state"""
         return self.states[state].update(value)
 
-    def bulk_update(self, **kwargs) -> None:
+    def bulk_update(self, **kwargs) -> bool:
         """Called from an item to update multiple states"""
         updated = set()
         for state, value in kwargs.items():
@@ -142,27 +205,57 @@ class StateProxy:
             updated.add(state)
 
         if not updated:
-            return
-        self.core.event_bus.broadcast(
-            "state_change", item=self.item, changes=kwargs)
+            return False
+        self.core.event_bus.broadcast_state_change(self.item, kwargs)
         LOGGER.debug("State change: %s %s", self.item.identifier, kwargs)
+        for state in updated:
+            if self.states[state].poll_job:
+                self.core.scheduler.tighten(self.states[state].poll_job)
+        return True
 
-    async def dump(self) -> Dict[str, Any]:
-        """Return a JSON serialisable object"""
-        return {
-            name: await self.states[name].get() for name in self.states
-        }
+    async def dump(
+            self, timeout: Optional[float] = STATE_DUMP_TIMEOUT
+    ) -> Dict[str, Any]:
+        """
+        Return a JSON serialisable object
+
+        Getters run concurrently, states whose getter
+        exceeds the timeout are dumped with their last known value
+        """
+        self.mark_read()
+        result = {}
+        fetching = []
+        for name, state in self.states.items():
+            if state.needs_fetch():
+                # Keeps the order of the states
+                result[name] = None
+                fetching.append(state)
+            else:
+                result[name] = await state.get()
+
+        if len(fetching) == 1:
+            result[fetching[0].name] = await fetching[0].fetch(timeout)
+        elif fetching:
+            values = await asyncio.gather(
+                *(state.fetch(timeout) for state in fetching))
+            for state, value in zip(fetching, values):
+                result[state.name] = value
+        return result
 
 
 class State:
     """Holds one state of an item"""
+    __slots__ = ("value", "name", "getter", "setter", "state_proxy",
+                 "schema", "poll_interval", "log_state", "cache_ttl",
+                 "cached_at", "poll_job")
 
     getter: Optional[Callable]
     setter: Optional[Callable]
     value: Any
-    mutable: bool
-    poll_task: Optional[asyncio.Task] = None
+    poll_job: Optional["PollJob"]
     schema: Optional[vol.Schema]
+    cache_ttl: Optional[float]
+    cached_at: Optional[float]
 
     # pylint: disable=too-many-arguments
     def __init__(self,
@@ -173,33 +266,75 @@ class State:
                  name: Optional[str] = None,
                  schema: Optional[vol.Schema] = None,
                  poll_interval: Optional[float] = None,
-                 log_state: Optional[bool] = True) -> None:
+                 log_state: Optional[bool] = True,
+                 cache_ttl: Optional[float] = None,
+                 max_poll_interval: Optional[float] = None) -> None:
         self.value = default
         self.name = name
         self.getter = getter
         self.setter = setter
         self.state_proxy = state_proxy
-        self.loop = self.state_proxy.core.loop
-        self.schema = vol.Schema(schema) if schema else None
+        self.schema = schema
         self.poll_interval = poll_interval
         self.log_state = log_state
-        if self.poll_interval:
-            self.poll_task = self.loop.create_task(self.poll_value())
+        self.cache_ttl = cache_ttl
+        self.cached_at = None
+        self.poll_job = None
+        if self.poll_interval and self.getter:
+            self.poll_job = self.state_proxy.core.scheduler.add_job(
+                self.poll_value, self.poll_interval,
+                name=f"{state_proxy.item.unique_identifier}.{name}",
+                jitter=self.poll_interval * POLL_JITTER,
+                max_interval=max_poll_interval)
 
     async def poll_value(self) -> None:
         """Polls the current state and updates it"""
-        while True:
-            if self.state_proxy.item.status == ItemStatus.ONLINE:
-                self.update(await self.getter())
-            await asyncio.sleep(cast(float, self.poll_interval))
+        item = self.state_proxy.item
+        if item.status != ItemStatus.ONLINE:
+            return
+        changed = self.update(await cast(Callable, self.getter)())
+        if self.poll_job and self.poll_job.max_interval:
+            self.state_proxy.core.scheduler.adapt(
+                self.poll_job, changed,
+                self.state_proxy.core.item_manager.is_watched(item))
+
+    def stop(self) -> None:
+        """Stops polling the state"""
+        if self.poll_job:
+            self.state_proxy.core.scheduler.remove_job(self.poll_job)
+            self.poll_job = None
+
+    def needs_fetch(self) -> bool:
+        """Returns whether get has to call the getter"""
+        if not self.getter or self.poll_interval:
+            return False
+        if self.state_proxy.item.status != ItemStatus.ONLINE:
+            return False
+        if not self.cache_ttl or self.cached_at is None:
+            return True
+        age = self.state_proxy.core.loop.time() - self.cached_at
+        return age >= self.cache_ttl
 
     async def get(self):
         """Gets a state"""
         if self.state_proxy.item.status != ItemStatus.ONLINE:
             return None
-        if self.getter and not self.poll_interval:
-            return await self.getter()
-        return self.value
+        if not self.needs_fetch():
+            return self.value
+        value = await cast(Callable, self.getter)()
+        # Also kept without cache_ttl as the last known value for fetch
+        self.value = value
+        self.cached_at = self.state_proxy.core.loop.time()
+        return value
+
+    async def fetch(self, timeout: Optional[float]):
+        """Gets a state, returns the last known value after a timeout"""
+        try:
+            return await asyncio.wait_for(self.get(), timeout)
+        except asyncio.TimeoutError:
+            LOGGER.warning("Getter for state %s of %s timed out",
+                           self.name, self.state_proxy.item.unique_identifier)
+            return self.value
 
     async def set(self, value) -> Dict[str, Any]:
         """Sets a state"""
@@ -212,8 +347,8 @@ class State:
             result: dict = await self.setter(value)
             for state, change in result.items():
                 self.state_proxy.states[state].value = change
-            self.state_proxy.core.event_bus.broadcast(
-                "state_change", item=self.state_proxy.item, changes=result)
+            self.state_proxy.core.event_bus.broadcast_state_change(
+                self.state_proxy.item, result)
             LOGGER.debug("State change: %s %s",
                          self.state_proxy.item.identifier, result)
             return result
@@ -234,10 +369,8 @@ class State:
         """Updates a state"""
         if not self.value == value:
             self.value = value
-            self.state_proxy.core.event_bus.broadcast(
-                "state_change", item=self.state_proxy.item, changes={
-                    self.name: self.value
-                })
+            self.state_proxy.core.event_bus.broadcast_state_change(
+                self.state_proxy.item, {self.name: self.value})
             LOGGER.debug("State change: %s %s",
                          self.state_proxy.item.identifier, {self.name: value})
 
@@ -1,22 +1,26 @@
 """json based storage helper for homecontrol"""
 import asyncio
 import logging
-import os
+import time
 from datetime import datetime
-from json import JSONDecodeError, dump, load
-from shutil import copyfile
-from typing import TYPE_CHECKING, Any, Callable, Optional, cast
+from json import JSONDecodeError, dumps, loads
+from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Optional,
+                    cast)
+from weakref import WeakSet
 
 import voluptuous as vol
 
+from homecontrol.const import STORAGE_JOURNAL_MAX_SIZE, STORAGE_SAVE_DELAY
+from homecontrol.dependencies.storage_engines import (JournalRecord,
+                                                      StorageEngine,
+                                                      get_engine)
+
 if TYPE_CHECKING:
     from homecontrol.core import Core
 
 
 LOGGER = logging.getLogger(__name__)
 
-STORAGE_FOLDER = ".storage"
-
 """
 File format:
 storage.json
@@ -27,7 +31,8 @@ storage.json
     },
     name: "storage",
     last_update: "2019-09-20 22:31:34.682203"
-    version: 1
+    version: 1,
+    generation: 3
 }
 """
 
@@ -35,13 +40,47 @@ FILE_SCHEMA = vol.Schema({
     "data": vol.All(),
     "name": str,
     "last_update": vol.Coerce(datetime.fromisoformat),
-    "version": int
+    "version": int,
+    vol.Optional("generation", default=0): int
 })
 
+"""
+Journal format:
+storage.journal
+
+One JSON record per line, appended to since the last snapshot
+{"op": "set", "key": key, "data": {key: value}, "generation": 3}
+{"op": "del", "key": key, "generation": 3}
+
+data is dumped. Records carry the generation of the snapshot they follow,
+records of an older generation are already contained in the snapshot.
+They are left behind if the journal can't be cleared after a snapshot.
+"""
+
 
+# pylint: disable=too-many-instance-attributes
 class Storage:
-    """JSON-file based data storage"""
+    """
+    JSON based data storage
+
+    The data is persisted by the configured StorageEngine,
+    by default as one file per storage.
+
+    Saves are debounced, all saves within save_delay seconds
+    are coalesced into one write of the latest data.
+    Failed writes stay pending and are retried.
+    Files are replaced atomically so that a crash can't leave
+    a partially written file behind.
+
+    Journal-backed storages hold a dict whose changes are appended
+    to a journal through save_key and delete_key so that a write
+    doesn't depend on the size of the storage.
+    The journal is compacted into the JSON file when it grows
+    past journal_max_size and replayed when loading.
+    """
+    instances: "WeakSet[Storage]" = WeakSet()
 
+    # pylint: disable=too-many-arguments
     def __init__(self,
                  name: str,
                  version: int,
@@ -51,7 +90,11 @@ class Storage:
                  storage_init: Optional[Callable] = None,
                  loader: Optional[Callable] = None,
                  dumper: Optional[Callable] = None,
-                 migrator: Optional[Callable] = None) -> None:
+                 migrator: Optional[Callable] = None,
+                 save_delay: float = STORAGE_SAVE_DELAY,
+                 journal: bool = False,
+                 journal_max_size: int = STORAGE_JOURNAL_MAX_SIZE,
+                 engine: Optional[StorageEngine] = None) -> None:
         self.version = version
         self.storage_init = storage_init
         self.loader = loader
@@ -59,27 +102,48 @@ class Storage:
         self.migrator = migrator
         self.loop = loop or core.loop
         self.cfg_dir = cfg_dir or core.cfg_dir
-        self._save_task: Optional[asyncio.Future] = None
+        self.save_delay = save_delay
         self.name = name
         self._data = None
-        self.path = os.path.join(
-            self.cfg_dir, STORAGE_FOLDER, f"{self.name}.json")
+        self.engine = engine or get_engine(self.cfg_dir)
+        self.journal = journal
+        self.journal_max_size = journal_max_size
+        self.journal_size = 0
+        # Incremented with every snapshot
+        self.generation = 0
+        self._journal_buffer: List[JournalRecord] = []
+
+        self._dirty = False
+        self._pending_data: Any = None
+        # Resolves when the pending data is written
+        self._waiter: Optional[asyncio.Future] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.flushes = 0
+        self.compactions = 0
+        self.failures = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_flush: Optional[float] = None
+        self.instances.add(self)
 
     def load_data(self) -> Any:
-        """Loads data from the corresponding file"""
+        """Loads data from the storage engine"""
         data = None
         if self._data is not None:
             return self._data["data"]
-        if os.path.isfile(self.path):
+        content = self.engine.read(self.name)
+        if content is not None:
             try:
-                with open(self.path, "r") as file:
-                    data = FILE_SCHEMA(load(file))
+                data = FILE_SCHEMA(loads(content))
             except (vol.Error, JSONDecodeError):
                 LOGGER.error(
                     "Storage data for storage %s invalid. "
                     "Backing up and resetting.",
                     self.name, exc_info=True)
-                copyfile(self.path, self.path + ".backup")
+                self.engine.backup(self.name)
 
         if data and data["version"] != self.version:
             if self.migrator:
@@ -88,8 +152,9 @@ class Storage:
                 logging.warning(
                     "No migrator found for storage %s from version %s to %s",
                     self.name, data["version"], self.version)
-                copyfile(self.path, self.path + ".backup")
+                self.engine.backup(self.name)
 
+        needs_save = not data
         if not data:
             data = {
                 "data": self.storage_init() if self.storage_init else None,
@@ -97,14 +162,42 @@ class Storage:
                 "last_update": datetime.utcnow(),
                 "version": self.version,
             }
-            self.schedule_save(data["data"])
 
         if self.loader:
             data["data"] = self.loader(data["data"])
 
+        self.generation = data.get("generation", 0)
+        if self.journal:
+            # Replayed records are compacted into a new snapshot
+            needs_save = self._replay_journal(data["data"]) or needs_save
+
         self._data = data
+        if needs_save:
+            self.schedule_save(data["data"])
         return self._data["data"]
 
+    def _replay_journal(self, data: dict) -> bool:
+        """Applies the journal to data, returns if it had records"""
+        records = 0
+        for line in self.engine.read_records(self.name):
+            try:
+                record = loads(line)
+            except JSONDecodeError:
+                # The last record may be torn by a crash
+                LOGGER.warning(
+                    "Invalid record in journal of storage %s, "
+                    "ignoring the rest", self.name)
+                break
+            if record.get("generation", 0) < self.generation:
+                continue
+            records += 1
+            if record["op"] == "set":
+                data.update(self.loader(record["data"])
+                            if self.loader else record["data"])
+            elif record["op"] == "del":
+                data.pop(record["key"], None)
+        return bool(records)
+
     @property
     def last_update(self) -> Optional[datetime]:
         """Property to get the timestamp for the last update"""
@@ -112,6 +205,11 @@ class Storage:
             return None
         return self._data.get("last_update")
 
+    @property
+    def pending(self) -> bool:
+        """Whether there is data that isn't written yet"""
+        return bool(self._dirty or self._journal_buffer or self._flush_task)
+
     @classmethod
     def get_storage(cls, *args, **kwargs) -> "Storage":
         """
@@ -121,40 +219,212 @@ class Storage:
         storage.load_data()
         return storage
 
-    def schedule_save(self, data: Any) -> asyncio.Task:
-        """Saves the data"""
-        return self.loop.create_task(self.save_data(data))
+    def schedule_save(self, data: Any) -> asyncio.Future:
+        """
+        Schedules data to be saved
 
-    async def save_data(self, data: Any) -> None:
-        """Saves the data"""
+        The returned future resolves to True once the data is written,
+        failed writes are retried
+        """
+        self.requests += 1
+        self._dirty = True
+        self._pending_data = data
         self._data = {
             "data": data,
             "last_update": datetime.utcnow().isoformat(),
             "version": self.version,
             "name": self.name
         }
+        if not self._waiter:
+            self._waiter = self.loop.create_future()
+        waiter = self._waiter
+        # A running flush schedules the next one when it's done
+        if not self._flush_handle and not self._flush_task:
+            self._flush_handle = self.loop.call_later(
+                self.save_delay, self._start_flush)
+        return waiter
+
+    def save_key(self, data: dict, key: str) -> asyncio.Future:
+        """Saves a key that was set in data"""
+        if not self.journal:
+            return self.schedule_save(data)
+        dumped = {key: data[key]}
+        return self._append(key, {
+            "op": "set",
+            "key": key,
+            "data": self.dumper(dumped) if self.dumper else dumped
+        }, data)
+
+    def delete_key(self, data: dict, key: str) -> asyncio.Future:
+        """Saves that a key was deleted from data"""
+        return self._append(key, {"op": "del", "key": key}, data)
+
+    def _append(
+            self, key: str, record: dict, data: dict) -> asyncio.Future:
+        """Appends a record to the journal"""
+        if not self.journal:
+            return self.schedule_save(data)
+        if self._dirty:
+            # The pending snapshot already contains the change
+            self._pending_data = data
+            return cast(asyncio.Future, self._waiter)
+        self.requests += 1
+        record["generation"] = self.generation
+        # Serialised now since the value may be changed later
+        self._journal_buffer.append((key, dumps(record)))
+        self._data = {
+            "data": data,
+            "last_update": datetime.utcnow().isoformat(),
+            "version": self.version,
+            "name": self.name
+        }
+        if not self._waiter:
+            self._waiter = self.loop.create_future()
+        waiter = self._waiter
+        if not self._flush_handle and not self._flush_task:
+            self._flush_handle = self.loop.call_later(
+                self.save_delay, self._start_flush)
+        return waiter
+
+    async def save_data(self, data: Any) -> bool:
+        """Saves the data without delay, returns if it was written"""
+        waiter = self.schedule_save(data)
+        await self.flush()
+        return waiter.done() and waiter.result()
+
+    async def flush(self) -> None:
+        """
+        Writes pending data now
 
-        def _save_data() -> None:
-            storage_dir = os.path.dirname(self.path)
-            if not os.path.isdir(storage_dir):
-                os.makedirs(storage_dir, exist_ok=True)
-
-            save_data = {
-                "data": data if not self.dumper else self.dumper(data),
-                "last_update": datetime.utcnow().isoformat(),
-                "version": self.version,
-                "name": self.name
-            }
+        Returns after a failed write, the data stays pending
+        and is retried after save_delay
+        """
+        failures = self.failures
+        while self.failures == failures:
+            if self._flush_handle:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            if self._flush_task:
+                await asyncio.shield(self._flush_task)
+            elif self._dirty or self._journal_buffer:
+                self._start_flush()
+            else:
+                return
+
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        if not self._flush_task:
+            self._flush_task = self.loop.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        snapshot, data, waiter = (
+            self._dirty, self._pending_data, self._waiter)
+        records = self._journal_buffer
+        self._dirty = False
+        self._pending_data = self._waiter = None
+        # A snapshot contains every buffered record
+        self._journal_buffer = []
+        success = False
+        start = time.perf_counter()
+        try:
+            if snapshot:
+                # Records buffered from now on follow the new snapshot
+                self.generation += 1
+                # Serialised in the loop since data may be changed meanwhile
+                content = dumps({
+                    "data": data if not self.dumper else self.dumper(data),
+                    "last_update": datetime.utcnow().isoformat(),
+                    "version": self.version,
+                    "name": self.name,
+                    "generation": self.generation
+                }, sort_keys=True, indent=4)
+                await self.loop.run_in_executor(
+                    None, self.engine.write, self.name, content)
+                self.journal_size = 0
+            else:
+                await self.loop.run_in_executor(
+                    None, self.engine.append, self.name, records)
+                self.journal_size += sum(
+                    len(record) + 1 for _, record in records)
+            success = True
+        except Exception:  # pylint: disable=broad-except
+            self.failures += 1
+            LOGGER.error("Error saving storage %s",
+                         self.name, exc_info=True)
+        finally:
+            duration = time.perf_counter() - start
+            self.flushes += 1
+            self.total_time += duration
+            self.max_time = max(self.max_time, duration)
+            self.last_flush = time.time()
+            self._flush_task = None
+            if not success:
+                self._restore_pending(snapshot, data, records, waiter)
+            elif waiter and not waiter.done():
+                waiter.set_result(True)
+            if (success and not snapshot
+                    and self.journal_size > self.journal_max_size):
+                self.compactions += 1
+                self.schedule_save(cast(dict, self._data)["data"])
+            if ((self._dirty or self._journal_buffer)
+                    and not self._flush_handle):
+                self._flush_handle = self.loop.call_later(
+                    self.save_delay, self._start_flush)
+
+    def _restore_pending(
+            self, snapshot: bool, data: Any, records: List[JournalRecord],
+            waiter: Optional[asyncio.Future]) -> None:
+        """
+        Puts the data of a failed flush back so that it's retried
 
-            with open(self.path, "w") as file:
-                dump(save_data, file, sort_keys=True, indent=4)
+        A failed append may have left a torn record in the journal,
+        records after it would be ignored when replaying.
+        The retry is therefore a snapshot of the current data.
+        """
+        self._journal_buffer[:0] = records
+        if not self._dirty:
+            self._dirty = True
+            self._pending_data = (
+                data if snapshot else cast(dict, self._data)["data"])
+        if waiter:
+            newer_waiter, self._waiter = self._waiter, waiter
+            if newer_waiter:
+                waiter.add_done_callback(
+                    lambda future: newer_waiter.done()
+                    or newer_waiter.set_result(future.result()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns the write statistics"""
+        return {
+            "name": self.name,
+            "requests": self.requests,
+            "journal": self.journal,
+            "journal_size": self.journal_size,
+            "flushes": self.flushes,
+            "compactions": self.compactions,
+            "failures": self.failures,
+            "pending": self.pending,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "mean_time": (self.total_time / self.flushes
+                          if self.flushes else 0.0),
+            "last_flush": self.last_flush
+        }
 
-        if not self._save_task or self._save_task.done():
-            self._save_task = cast(
-                asyncio.Future, self.loop.run_in_executor(
-                    None, _save_data))
+    @classmethod
+    def get_all_stats(cls) -> List[Dict[str, Any]]:
+        """Returns the write statistics of every storage"""
+        return sorted(
+            (storage.get_stats() for storage in list(cls.instances)),
+            key=lambda stats: stats["total_time"], reverse=True)
 
-        return await self._save_task
+    @classmethod
+    async def flush_all(cls) -> None:
+        """Writes the pending data of every storage"""
+        storages = [storage for storage in list(cls.instances)
+                    if storage.pending]
+        if storages:
+            await asyncio.gather(*(storage.flush() for storage in storages))
 
 
 class DictWrapper(dict):
@@ -167,13 +437,13 @@ class DictWrapper(dict):
         self.storage = storage
         self.dict = storage.load_data()
 
-    def schedule_save(self) -> asyncio.Task:
+    def schedule_save(self) -> asyncio.Future:
         """Schedules the current data to be saved"""
         return self.storage.schedule_save(self.dict)
 
     def __setitem__(self, key, item):
         self.dict[key] = item
-        self.schedule_save()
+        self.storage.save_key(self.dict, key)
 
     def __getitem__(self, key):
         return self.dict[key]
@@ -186,7 +456,7 @@ class DictWrapper(dict):
 
     def __delitem__(self, key):
         del self.dict[key]
-        self.schedule_save()
+        self.storage.delete_key(self.dict, key)
 
     def get(self, key, default=None):
         return self.dict.get(key, default)
@@ -199,8 +469,10 @@ class DictWrapper(dict):
         return self.dict.copy()
 
     def update(self, *args, **kwargs):
-        self.dict.update(*args, **kwargs)
-        self.schedule_save()
+        changes = dict(*args, **kwargs)
+        self.dict.update(changes)
+        for key in changes:
+            self.storage.save_key(self.dict, key)
 
     def keys(self):
         return self.dict.keys()
@@ -211,9 +483,11 @@ class DictWrapper(dict):
     def items(self):
         return self.dict.items()
 
-    def pop(self, *args):
-        result = self.dict.pop(*args)
-        self.schedule_save()
+    def pop(self, key, *args):
+        if key not in self.dict:
+            return self.dict.pop(key, *args)
+        result = self.dict.pop(key)
+        self.storage.delete_key(self.dict, key)
         return result
 
     def setdefault(self, key, default):
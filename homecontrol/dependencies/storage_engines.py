@@ -0,0 +1,277 @@
+"""Storage engines persisting the data of Storage objects"""
+import logging
+import os
+import sqlite3
+import threading
+from json import JSONDecodeError, loads
+from shutil import copyfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import voluptuous as vol
+
+LOGGER = logging.getLogger(__name__)
+
+STORAGE_FOLDER = ".storage"
+SQLITE_FILE = "storage.db"
+
+CONFIG_SCHEMA = vol.Schema({
+    vol.Required("engine", default="json"): vol.Any("json", "sqlite")
+})
+
+# (key, record)
+JournalRecord = Tuple[str, str]
+
+
+class StorageEngine:
+    """
+    Base class for storage engines
+
+    A store consists of a snapshot and journal records
+    that are applied to it when loading.
+    Every method except close may be called from executor threads.
+    """
+
+    def read(self, name: str) -> Optional[str]:
+        """Returns the snapshot of a store"""
+        raise NotImplementedError()
+
+    def read_records(self, name: str) -> Iterator[str]:
+        """Returns the journal records of a store in order"""
+        raise NotImplementedError()
+
+    def write(self, name: str, content: str) -> None:
+        """Replaces the snapshot of a store and clears its journal"""
+        raise NotImplementedError()
+
+    def append(self, name: str, records: List[JournalRecord]) -> None:
+        """Appends records to the journal of a store"""
+        raise NotImplementedError()
+
+    def backup(self, name: str) -> None:
+        """Keeps a copy of a snapshot that can't be loaded"""
+        raise NotImplementedError()
+
+    def names(self) -> List[str]:
+        """Returns the names of all stores"""
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Closes the engine"""
+
+
+class JSONEngine(StorageEngine):
+    """
+    Stores every store in a JSON file in the storage folder,
+    the journal is appended to a file next to it
+    """
+
+    def __init__(self, cfg_dir: str) -> None:
+        self.folder = os.path.join(cfg_dir, STORAGE_FOLDER)
+
+    def path(self, name: str) -> str:
+        """Returns the path of the snapshot file"""
+        return os.path.join(self.folder, f"{name}.json")
+
+    def journal_path(self, name: str) -> str:
+        """Returns the path of the journal file"""
+        return os.path.join(self.folder, f"{name}.journal")
+
+    def read(self, name: str) -> Optional[str]:
+        if not os.path.isfile(self.path(name)):
+            return None
+        with open(self.path(name), "r") as file:
+            return file.read()
+
+    def read_records(self, name: str) -> Iterator[str]:
+        if not os.path.isfile(self.journal_path(name)):
+            return
+        with open(self.journal_path(name), "r") as file:
+            yield from file
+
+    def write(self, name: str, content: str) -> None:
+        path = self.path(name)
+        storage_dir = os.path.dirname(path)
+        os.makedirs(storage_dir, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        if os.name != "nt":  # Directories can't be opened on Windows
+            dir_fd = os.open(storage_dir, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        # The journal is contained in the new snapshot.
+        # Records left by a crash before this are older than the snapshot
+        # and skipped by Storage when replaying
+        if os.path.isfile(self.journal_path(name)):
+            os.truncate(self.journal_path(name), 0)
+
+    def append(self, name: str, records: List[JournalRecord]) -> None:
+        os.makedirs(os.path.dirname(self.journal_path(name)), exist_ok=True)
+        with open(self.journal_path(name), "a") as file:
+            file.write("".join(record + "\n" for _, record in records))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def backup(self, name: str) -> None:
+        copyfile(self.path(name), self.path(name) + ".backup")
+
+    def names(self) -> List[str]:
+        names = []
+        for directory, _, files in os.walk(self.folder):
+            for file in files:
+                if file.endswith(".json"):
+                    names.append(os.path.relpath(
+                        os.path.join(directory, file[:-len(".json")]),
+                        self.folder).replace(os.sep, "/"))
+        return names
+
+
+class SQLiteEngine(StorageEngine):
+    """
+    Stores every store in a single SQLite database in WAL mode
+
+    Journal records are kept as one row per key,
+    a newer record replaces the previous one of the same key.
+    """
+
+    def __init__(self, cfg_dir: str) -> None:
+        self.path = os.path.join(cfg_dir, STORAGE_FOLDER, SQLITE_FILE)
+        self.created = not os.path.isfile(self.path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "name TEXT PRIMARY KEY, content TEXT NOT NULL)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "name TEXT NOT NULL, key TEXT NOT NULL, record TEXT NOT NULL, "
+            "UNIQUE (name, key))")
+
+    def _execute(self, sql: str, *args) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, args).fetchall()
+
+    def _transaction(
+            self, statements: Iterable[Tuple[str, Iterable[tuple]]]) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                for sql, rows in statements:
+                    self._connection.executemany(sql, rows)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def read(self, name: str) -> Optional[str]:
+        rows = self._execute(
+            "SELECT content FROM snapshots WHERE name = ?", name)
+        return rows[0][0] if rows else None
+
+    def read_records(self, name: str) -> Iterator[str]:
+        rows = self._execute(
+            "SELECT record FROM records WHERE name = ? ORDER BY rowid", name)
+        for row in rows:
+            yield row[0]
+
+    def write(self, name: str, content: str) -> None:
+        self._transaction((
+            ("INSERT OR REPLACE INTO snapshots VALUES (?, ?)",
+             ((name, content),)),
+            ("DELETE FROM records WHERE name = ?", ((name,),))
+        ))
+
+    def append(self, name: str, records: List[JournalRecord]) -> None:
+        self._transaction((
+            ("INSERT OR REPLACE INTO records VALUES (?, ?, ?)",
+             ((name, key, record) for key, record in records)),
+        ))
+
+    def backup(self, name: str) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO snapshots "
+            "SELECT name || '.backup', content FROM snapshots "
+            "WHERE name = ?", name)
+
+    def names(self) -> List[str]:
+        return [row[0] for row in self._execute(
+            "SELECT name FROM snapshots UNION SELECT name FROM records")]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+def migrate(source: StorageEngine, target: StorageEngine) -> int:
+    """
+    Copies every store from source to target, returns their number
+
+    Raises ValueError for journal records without a key
+    """
+    names = source.names()
+    for name in names:
+        content = source.read(name)
+        if content is not None:
+            target.write(name, content)
+        records = []
+        for line in source.read_records(name):
+            try:
+                record = loads(line)
+            except JSONDecodeError:
+                break
+            if "key" not in record:
+                raise ValueError(
+                    f"Journal record of storage {name} has no key, "
+                    "load it once with the JSON engine to compact it")
+            records.append((record["key"], line.rstrip("\n")))
+        if records:
+            target.append(name, records)
+    return len(names)
+
+
+ENGINES: Dict[str, StorageEngine] = {}
+
+
+def create_engine(cfg_dir: str, cfg: Optional[dict] = None) -> StorageEngine:
+    """
+    Creates the engine configured in the storage domain
+    and uses it for every storage in cfg_dir
+
+    A new SQLite database imports the JSON files
+    which are kept as a backup.
+    """
+    cfg = CONFIG_SCHEMA(cfg or {})
+    engine: StorageEngine
+    if cfg["engine"] == "sqlite":
+        engine = SQLiteEngine(cfg_dir)
+        if engine.created:
+            try:
+                count = migrate(JSONEngine(cfg_dir), engine)
+            except BaseException:
+                # The migration is retried with the next start
+                engine.close()
+                os.remove(engine.path)
+                raise
+            if count:
+                LOGGER.info("Migrated %s JSON storages to SQLite", count)
+    else:
+        engine = JSONEngine(cfg_dir)
+    ENGINES[os.path.abspath(cfg_dir)] = engine
+    return engine
+
+
+def get_engine(cfg_dir: str) -> StorageEngine:
+    """Returns the engine for cfg_dir, defaults to the JSON engine"""
+    key = os.path.abspath(cfg_dir)
+    if key not in ENGINES:
+        ENGINES[key] = JSONEngine(cfg_dir)
+    return ENGINES[key]
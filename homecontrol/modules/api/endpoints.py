@@ -8,10 +8,12 @@ from aiohttp import web
 
 import voluptuous as vol
 from homecontrol.const import (ERROR_INVALID_ITEM_STATE,
-                               ERROR_INVALID_ITEM_STATES, ERROR_ITEM_NOT_FOUND,
+                               ERROR_INVALID_ITEM_STATES,
+                               ERROR_INVALID_ITEM_STATUS, ERROR_ITEM_NOT_FOUND,
                                ITEM_ACTION_NOT_FOUND, ITEM_STATE_NOT_FOUND,
                                ItemStatus)
 from homecontrol.dependencies.json_response import JSONResponse
+from homecontrol.dependencies.storage import Storage
 from homecontrol.exceptions import ItemNotOnlineError
 from homecontrol.modules.auth.decorator import needs_auth
 
@@ -34,6 +36,9 @@ def add_routes(app: web.Application):
     CoreShutdownView.register_view(app)
     CoreRestartView.register_view(app)
     ReloadConfigView.register_view(app)
+    EventBusStatsView.register_view(app)
+    SchedulerStatsView.register_view(app)
+    StorageStatsView.register_view(app)
     ListItemsView.register_view(app)
     GetItemView.register_view(app)
     ItemStatesView.register_view(app)
@@ -88,15 +93,70 @@ class ReloadConfigView(APIView):
         return self.json("Reloaded configuration")
 
 
+@needs_auth(owner_only=True)
+class EventBusStatsView(APIView):
+    """Returns the EventBus handler statistics"""
+    path = "/core/event_bus/stats"
+
+    async def get(self) -> JSONResponse:
+        """GET /core/event_bus/stats"""
+        return self.json({
+            "enabled": self.core.event_bus.record_stats,
+            "handlers": self.core.event_bus.get_stats()
+        })
+
+
+@needs_auth(owner_only=True)
+class SchedulerStatsView(APIView):
+    """Returns the poll job statistics"""
+    path = "/core/scheduler/stats"
+
+    async def get(self) -> JSONResponse:
+        """GET /core/scheduler/stats"""
+        return self.json(self.core.scheduler.get_stats())
+
+
+@needs_auth(owner_only=True)
+class StorageStatsView(APIView):
+    """Returns the storage write statistics"""
+    path = "/core/storage/stats"
+
+    async def get(self) -> JSONResponse:
+        """GET /core/storage/stats"""
+        return self.json(Storage.get_all_stats())
+
+
 @needs_auth()
 class ListItemsView(APIView):
-    """Lists the items"""
+    """
+    Lists the items
+
+    The query parameters type, implements, module and status
+    filter the items.
+    The response is cached until the ItemManager version changes
+    """
     path = "/items"
 
-    async def get(self) -> JSONResponse:
+    async def get(self) -> web.Response:
         """"GET /items"""
-        return self.json([
-            {
+        query = self.request.query
+        status = None
+        if "status" in query:
+            try:
+                status = ItemStatus(query["status"])
+            except ValueError:
+                return self.error(
+                    ERROR_INVALID_ITEM_STATUS,
+                    f"Invalid item status {query['status']}", 400)
+
+        filters = {
+            "item_type": query.get("type"),
+            "implements": query.get("implements"),
+            "module": query.get("module"),
+            "status": status
+        }
+        return self.cached_json(self.core.item_manager.version, lambda: [
+            *({
                 "identifier": item.identifier,
                 "unique_identifier": item.unique_identifier,
                 "name": item.name,
@@ -106,7 +166,8 @@ class ListItemsView(APIView):
                 "actions": list(item.actions.keys()),
                 "implements": item.implements,
                 "metadata": item.metadata
-            } for item in self.core.item_manager.items.values()
+            } for item in self.core.item_manager.query(**filters)),
+            *self.core.item_manager.describe_lazy(**filters)
         ])
 
 
@@ -118,7 +179,7 @@ class GetItemView(APIView):
     async def get(self) -> JSONResponse:
         """GET /item/{id}"""
         identifier = self.data["id"]
-        item = self.core.item_manager.items.get(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
 
         if not item:
             return self.error(
@@ -153,7 +214,7 @@ class ItemStatesView(APIView):
     async def get(self) -> JSONResponse:
         """GET /item/{id}/states"""
         identifier = self.data["id"]
-        item = self.core.item_manager.items.get(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
 
         if not item:
             return self.error(
@@ -169,7 +230,7 @@ class ItemStatesView(APIView):
     async def post(self) -> JSONResponse:
         """POST /item/{id}/states"""
         identifier = self.data["id"]
-        item = self.core.item_manager.items.get(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
 
         if not item:
             return self.error(
@@ -209,7 +270,7 @@ class ItemStateView(APIView):
         """POST /item/{id}/states/{state_name}"""
         identifier = self.data["id"]
         state_name = self.data["state_name"]
-        item = self.core.item_manager.items.get(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
 
         if not item:
             return self.error(
@@ -239,7 +300,7 @@ class ItemStateView(APIView):
         """GET /item/{id}/states/{state_name}"""
         identifier = self.data["id"]
         state_name = self.data["state_name"]
-        item = self.core.item_manager.items.get(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
 
         if not item:
             return self.error(
@@ -251,6 +312,7 @@ class ItemStateView(APIView):
                 ITEM_STATE_NOT_FOUND,
                 f"Couldn't get state {state_name} from item {identifier}")
 
+        item.states.mark_read()
         return self.json({
             "item": item.identifier,
             "type": item.type,
@@ -270,7 +332,7 @@ class ActionsView(APIView):
         Get an item's actions
         """
         identifier = self.data["id"]
-        item = self.core.item_manager.items.get(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
         if not item:
             return self.error(
                 ERROR_ITEM_NOT_FOUND,
@@ -292,7 +354,7 @@ class ExecuteActionView(APIView):
 
         identifier = self.data["id"]
         action_name = self.data["action_name"]
-        item = self.core.item_manager.items.get(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
         if not item:
             return self.error(
                 ERROR_ITEM_NOT_FOUND,
@@ -326,12 +388,12 @@ class ExecuteActionView(APIView):
 
 @needs_auth()
 class ListModulesView(APIView):
-    """Lists the items"""
+    """Lists the modules"""
     path = "/modules"
 
-    async def get(self) -> JSONResponse:
+    async def get(self) -> web.Response:
         """"GET /modules"""
-        return self.json([
+        return self.cached_json(self.core.module_manager.version, lambda: [
             {
                 "name": module.name,
                 "path": module.path,
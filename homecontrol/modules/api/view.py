@@ -1,9 +1,11 @@
 """The API view module"""
-from typing import TYPE_CHECKING, Any, Union
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Union
 
 from aiohttp import web
 
-from homecontrol.dependencies.json_response import JSONResponse
+from homecontrol.dependencies.json_response import JSONResponse, encode_body
+from homecontrol.dependencies.response_cache import (ResponseCache,
+                                                     etag_matches)
 
 if TYPE_CHECKING:
     from homecontrol.core import Core
@@ -12,14 +14,18 @@ if TYPE_CHECKING:
 class APIView(web.View):
     """
     An API view
+
+    Responses are pretty-printed with the query parameter pretty
     """
     core: "Core"
     path: str
+    response_cache = ResponseCache()
 
     def __init__(self, request):
         self.app = request.app
         self.core = self.app["core"]
         self.data = request.match_info
+        self.pretty = "pretty" in request.query
         super().__init__(request)
 
     @classmethod
@@ -33,7 +39,33 @@ class APIView(web.View):
             headers: dict = None) -> JSONResponse:
         """Creates a JSONResponse"""
         return JSONResponse(
-            data, status_code=status_code, core=self.core, headers=headers)
+            data, status_code=status_code, core=self.core, headers=headers,
+            pretty=self.pretty)
+
+    def cached_json(
+            self, version: Hashable,
+            build: Callable[[], Any]) -> web.Response:
+        """
+        Creates a JSON response from the data returned by build
+
+        The encoded response is cached until version changes.
+        Requests with a matching If-None-Match get a 304 response
+        without building or encoding anything.
+        """
+        cache = self.response_cache
+        key = str(self.request.rel_url)
+        etag = cache.etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(self.request.headers.get("If-None-Match"), etag):
+            return web.Response(status=304, headers=headers)
+
+        body = cache.get(key, etag)
+        if body is None:
+            body = encode_body(build(), self.pretty, self.core)
+            cache.set(key, etag, body)
+        return web.Response(
+            body=body, content_type="application/json", charset="utf-8",
+            headers=headers)
 
     def error(
             self, error: Union[str, Exception],
@@ -46,5 +78,5 @@ class APIView(web.View):
             } if isinstance(error, Exception) else {
                 "type": error,
                 "message": message
-            }, status_code=status_code
+            }, status_code=status_code, pretty=self.pretty
         )
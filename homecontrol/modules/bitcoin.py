@@ -1,11 +1,12 @@
 """Bitcoin stats"""
-import asyncio
+from typing import Optional
 
 import requests
 
 import voluptuous as vol
 from homecontrol.dependencies.action_decorator import action
 from homecontrol.dependencies.entity_types import Item
+from homecontrol.dependencies.scheduler import PollJob
 from homecontrol.dependencies.state_proxy import StateDef
 
 SPEC = {
@@ -27,7 +28,7 @@ DATA_URL = "https://api.blockchain.info/stats"
 class BitcoinStats(Item):
     """Item holding Bitcoin stats"""
 
-    update_task: asyncio.Task
+    update_job: Optional[PollJob] = None
     last_update = StateDef()
     market_price_usd = StateDef()
     hash_rate = StateDef()
@@ -41,22 +42,20 @@ class BitcoinStats(Item):
 
     async def init(self):
         """Initialise the item"""
-        self.update_task = self.core.loop.create_task(self.update_interval())
-
-    async def update_interval(self) -> None:
-        """Updates the states"""
-        while True:
-            await self.update_stats()
-            await asyncio.sleep(self.cfg["update_interval"])
+        self.update_job = self.core.scheduler.add_job(
+            self.update_stats, self.cfg["update_interval"],
+            name=f"{self.unique_identifier}.update", jitter=10)
 
     async def stop(self) -> None:
-        self.update_task.cancel()
+        self.core.scheduler.remove_job(self.update_job)
 
     @action("update")
     async def update_stats(self):
         """Update the current states"""
         try:
-            result = RESULT_SCHEMA(requests.get(DATA_URL).json())
+            response = await self.core.loop.run_in_executor(
+                None, requests.get, DATA_URL)
+            result = RESULT_SCHEMA(response.json())
         except vol.SchemaError:
             return
 
@@ -62,7 +62,8 @@ class Chromecast(MediaPlayer):
     media_status = None
     device: Optional[DeviceStatus]
 
-    position = StateDef(poll_interval=1, log_state=False)
+    position = StateDef(
+        poll_interval=1, max_poll_interval=16, log_state=False)
 
     async def init(self) -> Optional[bool]:
         """Initialises the Chromecast item"""
@@ -74,8 +75,9 @@ class Chromecast(MediaPlayer):
                 **{**data, "uuid": UUID(data["uuid"])}),
             dumper=lambda data: {**data._asdict(), "uuid": data.uuid.hex})
 
-        self.device = pychromecast.get_device_status(
-            self.cfg["host"]) or self.storage.load_data()
+        self.device = await self.core.loop.run_in_executor(
+            None, pychromecast.get_device_status, self.cfg["host"]
+        ) or self.storage.load_data()
         if not self.device:
             LOGGER.error(
                 "Could not connect to chromecast at %s:%s",
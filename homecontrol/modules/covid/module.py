@@ -1,5 +1,4 @@
 """covid module"""
-import asyncio
 import logging
 from typing import Optional
 
@@ -9,6 +8,7 @@ from coronavirus import JohnsHopkinsCase, get_cases
 
 from homecontrol.dependencies.action_decorator import action
 from homecontrol.dependencies.entity_types import Item
+from homecontrol.dependencies.scheduler import PollJob
 from homecontrol.dependencies.state_proxy import StateDef
 
 LOGGER = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ LOGGER = logging.getLogger(__name__)
 
 class CovidStats(Item):
     """covid module"""
-    update_task: Optional[asyncio.Task] = None
+    update_job: Optional[PollJob] = None
 
     confirmed = StateDef()
     deaths = StateDef()
@@ -29,18 +29,13 @@ class CovidStats(Item):
 
     async def init(self):
         """Initialise the item"""
-        self.update_task = self.core.loop.create_task(self.update_interval())
         self.session = aiohttp.ClientSession(loop=self.core.loop)
-
-    async def update_interval(self) -> None:
-        """Updates the states"""
-        while True:
-            await self.update_stats()
-            await asyncio.sleep(self.cfg["update_interval"])
+        self.update_job = self.core.scheduler.add_job(
+            self.update_stats, self.cfg["update_interval"],
+            name=f"{self.unique_identifier}.update", jitter=10)
 
     async def stop(self) -> None:
-        if self.update_task:
-            self.update_task.cancel()
+        self.core.scheduler.remove_job(self.update_job)
         await self.session.close()
 
     @action("update")
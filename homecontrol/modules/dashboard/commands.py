@@ -1,6 +1,8 @@
 """Frontend websocket commands"""
 from typing import TYPE_CHECKING, Any, Dict, cast
 
+import voluptuous as vol
+
 from homecontrol.modules.auth.decorator import needs_auth
 from homecontrol.modules.websocket.command import WebSocketCommand
 
@@ -15,20 +17,20 @@ def add_commands(add_command):
 
 @needs_auth()
 class GetDashboardsCommand(WebSocketCommand):
-    """Returns the frontend panels"""
+    """
+    Returns the dashboards
+
+    If etag matches the current dashboards only not_modified is returned
+    """
     command = "dashboard:get_dashboards"
+    schema = {
+        vol.Optional("etag"): vol.Any(None, str)
+    }
 
     async def handle(self) -> Dict[Any, Any]:
         """Handle get_panels"""
         dashboard_mod = cast("Module", self.core.modules.dashboard)
-        return self.success({
-            "dashboards": {
-                dashboard.identifier: {
-                    "identifier": dashboard.identifier,
-                    "name": dashboard.name,
-                    "icon": dashboard.icon,
-                    "sections": dashboard.sections,
-                    "provider": dashboard.provider
-                } for dashboard in dashboard_mod.dashboards.values()
-            }
-        })
+        etag, dashboards = dashboard_mod.get_dashboards()
+        if self.data.get("etag") == etag:
+            return self.success({"etag": etag, "not_modified": True})
+        return self.success({"etag": etag, "dashboards": dashboards})
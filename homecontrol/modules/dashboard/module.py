@@ -1,5 +1,6 @@
 """The dashboard module"""
-from typing import TYPE_CHECKING, Any, Dict, List, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, cast
+from uuid import uuid4
 
 import voluptuous as vol
 from attr import attrib, attrs
@@ -42,11 +43,20 @@ class Dashboard(LinterFriendlyAttrs):
 
 
 class Module(ModuleDef):
-    """Provides dashboard configuration for frontend"""
+    """
+    Provides dashboard configuration for frontend
+
+    version changes whenever a dashboard is registered
+    """
     dashboards: Dict[str, Dashboard]
+    version: int
 
     async def init(self) -> None:
         self.dashboards = {}
+        self.version = 0
+        # Versions start from zero with every start
+        self.epoch = uuid4().hex[:8]
+        self._dump_cache: Optional[Tuple[int, Dict[str, dict]]] = None
         await self.load_yaml_config()
 
         @self.core.event_bus.register(EVENT_CORE_BOOTSTRAP_COMPLETE)
@@ -74,3 +84,21 @@ class Module(ModuleDef):
     def register_dashboard(self, dashboard: Dashboard) -> None:
         """Registers a Dashboard"""
         self.dashboards[dashboard.identifier] = dashboard
+        self.version += 1
+
+    def get_dashboards(self) -> Tuple[str, Dict[str, dict]]:
+        """
+        Returns an ETag and the dumped dashboards,
+        they are only dumped again when the version changes
+        """
+        if not self._dump_cache or self._dump_cache[0] != self.version:
+            self._dump_cache = (self.version, {
+                dashboard.identifier: {
+                    "identifier": dashboard.identifier,
+                    "name": dashboard.name,
+                    "icon": dashboard.icon,
+                    "sections": dashboard.sections,
+                    "provider": dashboard.provider
+                } for dashboard in self.dashboards.values()
+            })
+        return f'"{self.epoch}-{self.version}"', self._dump_cache[1]
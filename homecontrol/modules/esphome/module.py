@@ -122,7 +122,7 @@ class ESPHomeDevice(Item):
         item.name = name
         item.cfg = cfg
 
-        item.actions = {}
+        item.actions = item.bind_actions()
 
         item.states = StateProxy(item, core)
         item.status = ItemStatus.OFFLINE
@@ -175,13 +175,20 @@ class PanelsView(APIView):
 
     async def get(self) -> web.Response:
         """GET /panels"""
-        return self.json([panel.to_dict() for panel in self.panels])
+        return self.cached_json(
+            self.module.panels_version,
+            lambda: [panel.to_dict() for panel in self.panels])
 
 
 class Module(ModuleType):
-    """The Frontend object"""
+    """
+    The Frontend object
+
+    panels_version changes whenever the panels change
+    """
     frontend_app: web.Application
     panels: List[Panel]
+    panels_version: int
     cfg: dict
     resource_path: str
 
@@ -190,6 +197,7 @@ class Module(ModuleType):
         self.cfg = await self.core.cfg.register_domain(
             "frontend", self, schema=CONFIG_SCHEMA)
         self.panels = []
+        self.panels_version = 0
         self.load_yaml_panels()
         self.resource_path = self.cfg["resource-path"]
         self.frontend_app = web.Application()
@@ -219,6 +227,7 @@ class Module(ModuleType):
     def register_panel(self, panel: Panel) -> None:
         """Register a panel"""
         self.panels.append(panel)
+        self.panels_version += 1
 
     def load_yaml_panels(self) -> None:
         """Loads panels from yaml configuration"""
@@ -227,6 +236,7 @@ class Module(ModuleType):
                 self.panels.remove(panel)
         for entry in self.cfg["panels"]:
             self.panels.append(Panel(**entry, provider=PROVIDER_YAML))
+        self.panels_version += 1
 
     async def apply_configuration(self, domain: str, cfg: dict) -> None:
         """Apply new configuration"""
@@ -1,7 +1,6 @@
 """Provides integration with iCloud devices"""
-import asyncio
 import os
-from typing import TYPE_CHECKING, Any, Dict, cast
+from typing import TYPE_CHECKING, Any, Dict, Optional, cast
 
 import voluptuous as vol
 from pyicloud import PyiCloudService
@@ -10,6 +9,7 @@ from pyicloud.services.findmyiphone import AppleDevice
 from homecontrol.const import ItemStatus
 from homecontrol.dependencies.action_decorator import action
 from homecontrol.dependencies.entity_types import Item
+from homecontrol.dependencies.scheduler import PollJob
 from homecontrol.dependencies.state_proxy import StateDef, StateProxy
 from homecontrol.modules.location.module import Location
 
@@ -34,11 +34,7 @@ class ICloudDeviceLocation(Location):
         item.name = device.name
         item.module = core.modules.icloud
 
-        item.actions = {}
-        for attribute in dir(item):
-            func = getattr(item, attribute)
-            if hasattr(func, "action_name"):
-                item.actions[getattr(func, "action_name")] = func
+        item.actions = item.bind_actions()
         item.states = StateProxy(item, core)
 
         return item
@@ -60,21 +56,18 @@ class ICloudDevice(Item):
     location_item: "ICloudDeviceLocation"
     device: AppleDevice
     device_id: str
-    update_task: asyncio.Task
+    update_job: Optional[PollJob] = None
 
     battery_level = StateDef()
 
     async def init(self) -> None:
-        self.update_task = self.core.loop.create_task(self._update_interval())
+        self.update_job = self.core.scheduler.add_job(
+            self.update_states, 30,
+            name=f"{self.unique_identifier}.update", jitter=3)
         self.location_item = await ICloudDeviceLocation.constructor(
             self.core, self)
         await self.core.item_manager.register_item(self.location_item)
 
-    async def _update_interval(self) -> None:
-        while True:
-            await self.update_states()
-            await asyncio.sleep(30)
-
     @action("update")
     async def update_states(self) -> None:
         """Updates the states"""
@@ -105,11 +98,7 @@ class ICloudDevice(Item):
         item.name = name
         item.core = core
 
-        item.actions = {}
-        for attribute in dir(item):
-            func = getattr(item, attribute)
-            if hasattr(func, "action_name"):
-                item.actions[getattr(func, "action_name")] = func
+        item.actions = item.bind_actions()
 
         item.states = StateProxy(item, core)
 
@@ -120,7 +109,7 @@ class ICloudDevice(Item):
         return item
 
     async def stop(self) -> None:
-        self.update_task.cancel()
+        self.core.scheduler.remove_job(self.update_job)
 
 
 class ICloudAccount(Item):
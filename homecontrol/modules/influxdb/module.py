@@ -1,11 +1,14 @@
 """InfluxDB module for data collection"""
 import logging
+from typing import List, Tuple
+
 import requests
 import voluptuous as vol
 from influxdb import InfluxDBClient
+from homecontrol.const import EVENT_STATE_CHANGE
 from homecontrol.dependencies.entity_types import ModuleDef
 from homecontrol.dependencies.entity_types import Item
-from homecontrol.dependencies.event_bus import Event
+from homecontrol.dependencies.event_bus import OVERFLOW_COALESCE, Event
 
 LOGGER = logging.getLogger(__name__)
 
@@ -45,30 +48,38 @@ class Module(ModuleDef):
             return LOGGER.error(
                 "Could not connect to InfluxDB at %s:%s",
                 self.cfg["host"], self.cfg["port"])
-        self.core.event_bus.register("state_change")(self.on_state_change)
+        # Only one write at a time, merge waiting batches if the DB stalls
+        self.core.event_bus.register(
+            EVENT_STATE_CHANGE, batch=True,
+            max_concurrency=1, max_queue=8,
+            overflow=OVERFLOW_COALESCE)(self.on_state_changes)
 
-    async def on_state_change(
-            self, event: Event, item: Item, changes: dict) -> None:
-        """Write the new state to InfluxDB"""
-        changes = {
-            name: value
-            for name, value in changes.items()
-            if item.states.states[name].log_state
-            and type(value) in (str, bool, float, int)
-        }
-        if not changes:
+    async def on_state_changes(
+            self, event: Event, batch: List[Tuple[Item, dict]]) -> None:
+        """Write the new states to InfluxDB"""
+        points = []
+        for item, changes in batch:
+            changes = {
+                name: value
+                for name, value in changes.items()
+                if item.states.states[name].log_state
+                and type(value) in (str, bool, float, int)
+            }
+            if not changes:
+                continue
+            points.append({
+                "measurement": f"item_state.{item.unique_identifier}",
+                "tags": {
+                    "unique_identifier": item.unique_identifier
+                },
+                "time": event.timestamp,
+                "fields": changes
+            })
+        if not points:
             return
-        data = {
-            "measurement": f"item_state.{item.unique_identifier}",
-            "tags": {
-                "unique_identifier": item.unique_identifier
-            },
-            "time": event.timestamp,
-            "fields": changes
-        }
         try:
             await self.core.loop.run_in_executor(
-                None, self.influx.write_points, [data])
+                None, self.influx.write_points, points)
         except requests.exceptions.ConnectionError:
             return LOGGER.error(
                 "Could not connect to InfluxDB at %s:%s",
@@ -77,4 +88,4 @@ class Module(ModuleDef):
     async def stop(self) -> None:
         """Handles a HomeControl shutdown"""
         self.core.event_bus.remove_handler(
-            "state_change", self.on_state_change)
+            EVENT_STATE_CHANGE, self.on_state_changes)
@@ -1,5 +1,4 @@
 """A module for minecraft server status information"""
-import asyncio
 import logging
 from typing import Optional
 
@@ -8,6 +7,7 @@ from mcstatus import MinecraftServer as MCServer
 import voluptuous as vol
 from homecontrol.dependencies.action_decorator import action
 from homecontrol.dependencies.entity_types import Item, ItemStatus
+from homecontrol.dependencies.scheduler import PollJob
 from homecontrol.dependencies.state_proxy import StateDef
 
 LOGGER = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ LOGGER = logging.getLogger(__name__)
 class MinecraftServer(Item):
     """A Minecraft server item"""
     server: MCServer
-    status_task: Optional[asyncio.Task] = None
+    status_job: Optional[PollJob] = None
     config_schema = vol.Schema({
         vol.Required("host"): str,
         vol.Required("port", default=25565): int,
@@ -32,16 +32,12 @@ class MinecraftServer(Item):
 
     async def init(self) -> None:
         self.server = MCServer(self.cfg["host"], self.cfg["port"])
-        self.status_task = self.core.loop.create_task(self._iter_status())
-
-    async def _iter_status(self) -> None:
-        while True:
-            await self.get_status()
-            await asyncio.sleep(self.cfg["ping-interval"])
+        self.status_job = self.core.scheduler.add_job(
+            self.get_status, self.cfg["ping-interval"],
+            name=f"{self.unique_identifier}.status")
 
     async def stop(self) -> None:
-        if self.status_task:
-            self.status_task.cancel()
+        self.core.scheduler.remove_job(self.status_job)
 
     @action
     async def get_status(self) -> Optional[bool]:
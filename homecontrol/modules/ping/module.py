@@ -5,11 +5,13 @@ import re
 import sys
 from asyncio.subprocess import PIPE, create_subprocess_shell
 from contextlib import suppress
+from typing import Optional
 
 import voluptuous as vol
 
 from homecontrol.dependencies.action_decorator import action
 from homecontrol.dependencies.entity_types import Item
+from homecontrol.dependencies.scheduler import PollJob
 from homecontrol.dependencies.state_proxy import StateDef
 
 LOGGER = logging.getLogger(__name__)
@@ -33,7 +35,7 @@ else:
 class PingSensor(Item):
     """An item that pings an address"""
 
-    update_task: asyncio.Task
+    update_job: Optional[PollJob] = None
     online = StateDef()
     min_ping = StateDef()
     max_ping = StateDef()
@@ -46,17 +48,13 @@ class PingSensor(Item):
 
     async def init(self) -> None:
         """Initialise the item"""
-        self.update_task = self.core.loop.create_task(self.update_interval())
         self.command = PING_COMMAND.format(**self.cfg)
-
-    async def update_interval(self) -> None:
-        """Updates the states"""
-        while True:
-            await self.update()
-            await asyncio.sleep(self.cfg["update_interval"])
+        self.update_job = self.core.scheduler.add_job(
+            self.update, self.cfg["update_interval"],
+            name=f"{self.unique_identifier}.update", jitter=1)
 
     async def stop(self) -> None:
-        self.update_task.cancel()
+        self.core.scheduler.remove_job(self.update_job)
 
     @action("update")
     async def update(self) -> None:
@@ -3,7 +3,7 @@ import asyncio
 import logging
 import time
 from functools import partial
-from typing import TYPE_CHECKING, Any, Dict, cast
+from typing import TYPE_CHECKING, Any, Dict, Optional, cast
 from urllib.parse import urljoin
 from uuid import uuid4
 
@@ -15,6 +15,7 @@ from spotipy.oauth2 import SpotifyOAuth
 from homecontrol.dependencies.action_decorator import action
 from homecontrol.dependencies.entity_types import ModuleDef
 from homecontrol.dependencies.item_manager import StorageEntry
+from homecontrol.dependencies.scheduler import PollJob
 from homecontrol.dependencies.storage import Storage
 from homecontrol.modules.media_player.module import MediaPlayer
 
@@ -100,7 +101,7 @@ class Spotify(MediaPlayer):
     module: "Module"
     token: Dict[str, Any]
     refresh_handle: asyncio.TimerHandle
-    update_task: asyncio.Task
+    update_job: Optional[PollJob] = None
     config_schema = vol.Schema({
         vol.Required("refresh_token"): str,
         vol.Required("scope"): str,
@@ -120,13 +121,14 @@ class Spotify(MediaPlayer):
         self.token = self.storage.load_data() or self.cfg
 
         self._keep_access_token_new()
-        self.update_task = self.core.loop.create_task(
-            self._keep_states_updated())
+        self.update_job = self.core.scheduler.add_job(
+            self._update_states, 2,
+            name=f"{self.unique_identifier}.update")
         self.api = spotipy.Spotify(client_credentials_manager=self)
 
     async def stop(self) -> None:
         self.refresh_handle.cancel()
-        self.update_task.cancel()
+        self.core.scheduler.remove_job(self.update_job)
 
     def get_access_token(self) -> Dict[str, Any]:
         """Returns the access token for spotipy"""
@@ -147,11 +149,6 @@ class Spotify(MediaPlayer):
         self.refresh_handle = self.core.loop.call_at(
             next_call, self._keep_access_token_new)
 
-    async def _keep_states_updated(self) -> None:
-        while True:
-            await self._update_states()
-            await asyncio.sleep(2)
-
     async def _update_states(self) -> None:
         # pylint: disable=protected-access
         playback = await self.core.loop.run_in_executor(
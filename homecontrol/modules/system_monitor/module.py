@@ -1,10 +1,11 @@
 """system monitor module"""
-import asyncio
+from typing import Optional
 
 import psutil
 
 from homecontrol.dependencies.entity_types import Item, ModuleDef
 from homecontrol.dependencies.item_manager import StorageEntry
+from homecontrol.dependencies.scheduler import PollJob
 from homecontrol.dependencies.state_proxy import StateDef
 
 SPEC = {
@@ -25,7 +26,7 @@ class Module(ModuleDef):
 
 class SystemMonitor(Item):
     """The SystemMonitor item"""
-    update_job: asyncio.Task
+    update_job: Optional[PollJob] = None
 
     cpu_count = StateDef(default=psutil.cpu_count())
     cpu_percent = StateDef(default=psutil.cpu_percent(percpu=True))
@@ -42,25 +43,32 @@ class SystemMonitor(Item):
 
     async def init(self) -> None:
         """Start the update job"""
-        self.update_job = self.core.loop.create_task(self.update())
+        self.update_job = self.core.scheduler.add_job(
+            self.update, 2, name=f"{self.unique_identifier}.update",
+            max_interval=30)
+        self.states.add_poll_job(self.update_job)
 
     async def stop(self) -> None:
         """Cancel the update job"""
-        self.update_job.cancel()
+        self.states.remove_poll_job(self.update_job)
+        self.core.scheduler.remove_job(self.update_job)
 
     async def update(self) -> None:
-        """Update the CPU and memory stats every 2 seconds"""
-        def _update():
+        """Update the CPU and memory stats"""
+        def _read() -> dict:
             memory = psutil.virtual_memory()
             swap = psutil.swap_memory()
 
-            self.states.bulk_update(
+            return dict(
                 cpu_percent=psutil.cpu_percent(percpu=True),
                 memory_usage=memory.used,
                 memory_percent=memory.percent,
                 swap_usage=swap.used,
                 swap_percent=swap.percent
             )
-        while True:
-            await self.core.loop.run_in_executor(None, _update)
-            await asyncio.sleep(2)
+        changed = self.states.bulk_update(
+            **await self.core.loop.run_in_executor(None, _read))
+        if self.update_job:
+            self.core.scheduler.adapt(
+                self.update_job, changed,
+                self.core.item_manager.is_watched(self))
@@ -10,10 +10,12 @@ from homecontrol.const import (ERROR_INVALID_ITEM_STATES, ERROR_ITEM_NOT_FOUND,
                                ITEM_ACTION_NOT_FOUND)
 from homecontrol.dependencies.entity_types import Item, ItemStatus
 from homecontrol.dependencies.event_bus import Event
+from homecontrol.dependencies.storage import Storage
 from homecontrol.modules.auth.decorator import needs_auth
 from homecontrol.modules.auth.module import Module as AuthModule
 
 from .command import WebSocketCommand
+from .subscriptions import StateSubscription
 
 if TYPE_CHECKING:
     from homecontrol.modules.auth.auth.models import User
@@ -32,6 +34,9 @@ def add_commands(add_command):
     add_command(SetStatesCommand)
     add_command(CoreShutdownCommand)
     add_command(CoreRestartCommand)
+    add_command(CoreEventBusStatsCommand)
+    add_command(CoreSchedulerStatsCommand)
+    add_command(CoreStorageStatsCommand)
     add_command(GetUsersCommand)
 
 
@@ -46,31 +51,37 @@ class PingCommand(WebSocketCommand):
 
 @needs_auth()
 class WatchStatesCommand(WebSocketCommand):
-    """Command to watch states"""
+    """
+    Command to watch states
+
+    Optionally only watches the given items or item types
+    and only sends the given states
+    """
     command = "watch_states"
+    schema = {
+        vol.Optional("items"): [str],
+        vol.Optional("types"): [str],
+        vol.Optional("states"): [str]
+    }
 
     async def handle(self) -> Union[str, Dict[Any, Any]]:
         """Handle the watch_states command"""
-        if self.command not in self.session.subscriptions:
-            self.core.event_bus.register(
-                "state_change")(self.on_state_change)
+        # Subscribing to lazy items creates them
+        for identifier in self.data.get("items", ()):
+            await self.core.item_manager.ensure_item(identifier)
+
+        self.session.module.subscribe_states(StateSubscription(
+            self.session,
+            items=self.data.get("items"),
+            types=self.data.get("types"),
+            states=self.data.get("states")))
 
         self.session.subscriptions.add(self.command)
         return self.success("Now listening to state changes")
 
-    async def on_state_change(
-            self, event: Event, item: Item, changes: dict) -> None:
-        """Handle the state_change event"""
-        self.send_message({
-            "event": "state_change",
-            "item": item.unique_identifier,
-            "changes": changes
-        })
-
     async def close(self) -> None:
-        """Remove the event listener"""
-        self.core.event_bus.remove_handler(
-            "state_change", self.on_state_change)
+        """Remove the subscription"""
+        self.session.module.unsubscribe_states(self.session)
 
 
 @needs_auth()
@@ -82,12 +93,12 @@ class WatchStatusCommand(WebSocketCommand):
         """Handle the watch_status command"""
         if self.command not in self.session.subscriptions:
             self.core.event_bus.register(
-                EVENT_ITEM_STATUS_CHANGED)(self.on_status_change)
+                EVENT_ITEM_STATUS_CHANGED, sync=True)(self.on_status_change)
 
         self.session.subscriptions.add(self.command)
         return self.success("Now listening to status changes")
 
-    async def on_status_change(
+    def on_status_change(
             self, event: Event, item: Item, previous: ItemStatus) -> None:
         """Handle the status_change event"""
         self.send_message({
@@ -142,25 +153,85 @@ class CurrentUserCommand(WebSocketCommand):
 
 @needs_auth()
 class GetItemsCommand(WebSocketCommand):
-    """Returns information about the current items"""
+    """
+    Returns information about the current items
+
+    With since (and the epoch of the last reply) only the changes
+    since that sequence number are returned if they are still known,
+    otherwise a snapshot. state_change events carry their sequence number.
+
+    type, implements, module and status filter the items.
+    """
     command = "get_items"
+    schema = {
+        vol.Optional("since"): vol.Any(None, vol.All(int, vol.Range(min=0))),
+        vol.Optional("epoch"): vol.Any(None, str),
+        vol.Optional("type"): str,
+        vol.Optional("implements"): str,
+        vol.Optional("module"): str,
+        vol.Optional("status"): vol.Coerce(ItemStatus)
+    }
 
     async def handle(self) -> Union[str, Dict[Any, Any]]:
         """Handle the get_items command"""
-        return self.success([
-            {
-                "identifier": item.identifier,
-                "unique_identifier": item.unique_identifier,
-                "name": item.name,
-                "type": item.type,
-                "module": item.module.name,
-                "status": item.status.value,
-                "actions": list(item.actions.keys()),
-                "states": await item.states.dump(),
-                "implements": item.implements,
-                "metadata": item.metadata
-            } for item in self.core.item_manager.items.values()
-        ])
+        module = self.session.module
+        item_manager = self.core.item_manager
+        filters = None
+        if any(key in self.data
+               for key in ("type", "implements", "module", "status")):
+            filters = {
+                "item_type": self.data.get("type"),
+                "implements": self.data.get("implements"),
+                "module": self.data.get("module"),
+                "status": self.data.get("status")
+            }
+
+        if "since" not in self.data:
+            if filters is not None:
+                return self.success([
+                    *[await module.dump_item(item)
+                      for item in item_manager.query(**filters)],
+                    *module.describe_lazy_items(**filters)
+                ])
+            _, items = await module.items_snapshot()
+            return self.success(items)
+
+        selected_ids = None
+        if filters is not None:
+            selected_ids = {
+                *(item.unique_identifier
+                  for item in item_manager.query(**filters)),
+                *(description["unique_identifier"]
+                  for description in item_manager.describe_lazy(**filters))
+            }
+
+        journal = module.state_journal
+        if self.data["since"] is not None:
+            delta = journal.delta(self.data["since"], self.data.get("epoch"))
+            if delta is not None:
+                if selected_ids is not None:
+                    delta = {
+                        identifier: changes
+                        for identifier, changes in delta.items()
+                        if identifier in selected_ids
+                    }
+                return self.success({
+                    "type": "delta",
+                    "epoch": journal.epoch,
+                    "sequence": journal.sequence,
+                    "items": delta
+                })
+
+        sequence, items = await module.items_snapshot()
+        if selected_ids is not None:
+            items = [item for item in items
+                     if item["unique_identifier"] in selected_ids]
+        return self.success({
+            "type": "snapshot",
+            "epoch": journal.epoch,
+            "sequence": sequence,
+            "items": items
+        })
 
 
 @needs_auth()
@@ -195,7 +266,7 @@ class ActionCommand(WebSocketCommand):
         action = self.data["action"]
         kwargs = self.data.get("kwargs", {})
 
-        item = self.core.item_manager.get_item(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
         if not item:
             return self.error(
                 ERROR_ITEM_NOT_FOUND,
@@ -238,7 +309,7 @@ class SetStatesCommand(WebSocketCommand):
         identifier = self.data["item"]
         changes = self.data["changes"]
 
-        item = self.core.item_manager.get_item(identifier)
+        item = await self.core.item_manager.ensure_item(identifier)
         if not item:
             return self.error(
                 ERROR_ITEM_NOT_FOUND,
@@ -291,6 +362,39 @@ class CoreRestartCommand(WebSocketCommand):
         return self.success("Restarting")
 
 
+@needs_auth(owner_only=True)
+class CoreEventBusStatsCommand(WebSocketCommand):
+    """Returns the EventBus handler statistics"""
+    command = "core_event_bus_stats"
+
+    async def handle(self) -> Union[str, Dict[Any, Any]]:
+        """Handle the core_event_bus_stats command"""
+        return self.success({
+            "enabled": self.core.event_bus.record_stats,
+            "handlers": self.core.event_bus.get_stats()
+        })
+
+
+@needs_auth(owner_only=True)
+class CoreSchedulerStatsCommand(WebSocketCommand):
+    """Returns the poll job statistics"""
+    command = "core_scheduler_stats"
+
+    async def handle(self) -> Union[str, Dict[Any, Any]]:
+        """Handle the core_scheduler_stats command"""
+        return self.success(self.core.scheduler.get_stats())
+
+
+@needs_auth(owner_only=True)
+class CoreStorageStatsCommand(WebSocketCommand):
+    """Returns the storage write statistics"""
+    command = "core_storage_stats"
+
+    async def handle(self) -> Union[str, Dict[Any, Any]]:
+        """Handle the core_storage_stats command"""
+        return self.success(Storage.get_all_stats())
+
+
 @needs_auth(owner_only=True)
 class GetUsersCommand(WebSocketCommand):
     """Returns the users"""
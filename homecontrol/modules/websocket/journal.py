@@ -0,0 +1,75 @@
+"""Versioned journal of item changes used for delta synchronisation"""
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Optional, Tuple
+from uuid import uuid4
+
+# (sequence, unique_identifier, changes, status)
+JournalEntry = Tuple[int, Optional[str], Optional[dict], Optional[str]]
+
+
+class StateJournal:
+    """
+    Records item changes with a monotonically increasing sequence number
+
+    Clients that know a sequence number can be sent the changes since then
+    as long as they are still held in the journal.
+    The epoch changes with every start so that sequence numbers
+    of a previous run aren't mistaken for current ones.
+    """
+    __slots__ = ["epoch", "sequence", "structure_sequence", "entries"]
+
+    def __init__(self, max_entries: int) -> None:
+        self.epoch = uuid4().hex
+        self.sequence = 0
+        # The last sequence at which items were created or removed
+        self.structure_sequence = 0
+        self.entries: Deque[JournalEntry] = deque(maxlen=max_entries)
+
+    def record_state_change(self, item: str, changes: dict) -> int:
+        """Records a state change and returns its sequence number"""
+        self.sequence += 1
+        self.entries.append((self.sequence, item, changes, None))
+        return self.sequence
+
+    def record_status_change(self, item: str, status: str) -> int:
+        """Records a status change and returns its sequence number"""
+        self.sequence += 1
+        self.entries.append((self.sequence, item, None, status))
+        return self.sequence
+
+    def record_structure_change(self) -> int:
+        """Records that items were created or removed"""
+        self.sequence += 1
+        self.structure_sequence = self.sequence
+        self.entries.append((self.sequence, None, None, None))
+        return self.sequence
+
+    def delta(
+            self, since: int,
+            epoch: Optional[str] = None) -> Optional[Dict[str, dict]]:
+        """
+        Returns the merged changes per item since a sequence number
+        or None if the client has to fetch a snapshot
+        """
+        if epoch != self.epoch or since > self.sequence:
+            return None
+        if since < self.structure_sequence:
+            return None
+        if since == self.sequence:
+            return {}
+        if not self.entries or self.entries[0][0] > since + 1:
+            return None
+
+        result: Dict[str, dict] = {}
+        # Sequence numbers are consecutive, the offset can be computed
+        start = since + 1 - self.entries[0][0]
+        for _, item, changes, status in islice(self.entries, start, None):
+            if item is None:
+                continue
+            delta = result.setdefault(item, {})
+            if changes is not None:
+                delta.setdefault("states", {}).update(changes)
+            if status is not None:
+                delta["status"] = status
+        return result
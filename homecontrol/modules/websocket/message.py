@@ -1,4 +1,5 @@
 """WebSocket message class"""
+from typing import Union
 
 
 class WebSocketMessage:
@@ -32,3 +33,36 @@ class WebSocketMessage:
                 "message": message
             }
         }
+
+
+class StateChangeMessage:
+    """
+    A queued state_change message that later changes
+    for the same item can be merged into
+    """
+    __slots__ = ["item", "changes", "sequence", "encoded"]
+
+    def __init__(
+            self, item: str, changes: dict, sequence: int,
+            encoded: str = None) -> None:
+        self.item = item
+        self.changes = changes
+        self.sequence = sequence
+        self.encoded = encoded
+
+    def merge(self, changes: dict, sequence: int) -> None:
+        """Merges newer changes, only the latest value per state is kept"""
+        self.changes = {**self.changes, **changes}
+        self.sequence = sequence
+        self.encoded = None
+
+    def message(self) -> Union[str, dict]:
+        """Returns the message to be sent"""
+        if self.encoded is not None:
+            return self.encoded
+        return {
+            "event": "state_change",
+            "item": self.item,
+            "changes": self.changes,
+            "sequence": self.sequence
+        }
@@ -3,16 +3,25 @@
 import asyncio
 # pylint: disable=relative-beyond-top-level
 import logging
-from typing import TYPE_CHECKING, Optional, Union, cast
+from collections import defaultdict, deque
+from typing import (TYPE_CHECKING, Deque, Dict, FrozenSet, Iterable, List,
+                    Optional, Tuple, Union, cast)
 
 import voluptuous as vol
 from aiohttp import web
 
-from homecontrol.const import MAX_PENDING_WS_MSGS
-from homecontrol.dependencies.entity_types import ModuleDef
+from homecontrol.const import (EVENT_ITEM_CREATED, EVENT_ITEM_REMOVED,
+                               EVENT_ITEM_STATUS_CHANGED, EVENT_STATE_CHANGE,
+                               MAX_PENDING_WS_MSGS, MAX_WS_BATCH_DELAY,
+                               MAX_WS_JOURNAL_ENTRIES, WS_SNAPSHOT_MAX_AGE)
+from homecontrol.dependencies import json
+from homecontrol.dependencies.entity_types import Item, ItemStatus, ModuleDef
+from homecontrol.dependencies.event_bus import Event
 
 from .commands import WebSocketCommand, add_commands
-from .message import WebSocketMessage
+from .journal import StateJournal
+from .message import StateChangeMessage, WebSocketMessage
+from .subscriptions import StateSubscription, StateSubscriptionIndex
 
 if TYPE_CHECKING:
     from homecontrol.modules.auth.auth.models import User
@@ -43,8 +52,21 @@ class Module(ModuleDef):
         """Initialise the WebSocket module"""
         self.sessions = set()
         self.command_handlers = {}
+        self.state_subscriptions = StateSubscriptionIndex()
+        self.state_journal = StateJournal(MAX_WS_JOURNAL_ENTRIES)
+        # (sequence, creation time, items)
+        self._snapshot: Optional[Tuple[int, float, List[dict]]] = None
         self.core.event_bus.register(
             "http_add_api_routes")(self._add_api_route)
+        self.core.event_bus.register(
+            EVENT_STATE_CHANGE, sync=True)(self.on_state_change)
+        self.core.event_bus.register(
+            EVENT_ITEM_STATUS_CHANGED, sync=True)(self.on_status_change)
+        self.core.event_bus.register(
+            EVENT_ITEM_CREATED, sync=True)(self.on_items_change)
+        self.core.event_bus.register(
+            EVENT_ITEM_REMOVED, sync=True)(self.on_items_change)
+        self.core.item_manager.watch_checks.append(self._is_watched)
         self.core.event_bus.broadcast(
             "add_websocket_commands",
             add_command_handler=self.add_command_handler)
@@ -75,22 +97,194 @@ class Module(ModuleDef):
         handler.schema = schema
         self.command_handlers[handler.command] = handler
 
+    def subscribe_states(self, subscription: StateSubscription) -> None:
+        """Subscribes a session to state changes"""
+        self.state_subscriptions.add(subscription)
+        for item in self.core.item_manager.items.values():
+            if subscription.matches(item):
+                item.states.tighten_polling()
+
+    def unsubscribe_states(self, session: "WebSocketSession") -> None:
+        """Removes the state subscription of a session"""
+        if session in self.state_subscriptions.subscriptions:
+            self.state_subscriptions.remove(session)
+
+    def _is_watched(self, item: Item) -> bool:
+        return bool(self.state_subscriptions.match(item))
+
+    def on_state_change(
+            self, event: Event, item: Item, changes: dict) -> None:
+        """
+        Records state changes in the journal
+        and sends them to the subscribed sessions
+        """
+        sequence = self.state_journal.record_state_change(
+            item.unique_identifier, changes)
+        if not self.state_subscriptions:
+            return
+
+        # Sessions with the same state filter get the same payload
+        groups: Dict[Optional[FrozenSet[str]], List[StateSubscription]] = (
+            defaultdict(list))
+        for subscription in self.state_subscriptions.match(item):
+            groups[subscription.states].append(subscription)
+
+        for subscriptions in groups.values():
+            filtered_changes = subscriptions[0].filter_changes(changes)
+            if not filtered_changes:
+                continue
+            encoded = self.encode_message({
+                "event": "state_change",
+                "item": item.unique_identifier,
+                "changes": filtered_changes,
+                "sequence": sequence
+            })
+            if encoded is None:
+                continue
+            for subscription in subscriptions:
+                subscription.session.send_state_change(
+                    item.unique_identifier, filtered_changes,
+                    sequence, encoded)
+
+    def on_status_change(
+            self, event: Event, item: Item, previous: ItemStatus) -> None:
+        """Records status changes in the journal"""
+        self.state_journal.record_status_change(
+            item.unique_identifier, item.status.value)
+
+    def on_items_change(self, event: Event, item: Item) -> None:
+        """Records created and removed items in the journal"""
+        self.state_journal.record_structure_change()
+
+    async def items_snapshot(self) -> Tuple[int, List[dict]]:
+        """
+        Returns the sequence number and information about all items
+
+        A recent snapshot is reused with the journalled changes applied
+        instead of dumping every item again
+        """
+        journal = self.state_journal
+        now = self.core.loop.time()
+        if self._snapshot and now - self._snapshot[1] < WS_SNAPSHOT_MAX_AGE:
+            sequence, created, items = self._snapshot
+            delta = journal.delta(sequence, journal.epoch)
+            # States of items coming online are only known from a dump
+            if delta is not None and not any(
+                    _comes_online(item, delta[item["unique_identifier"]])
+                    for item in items if item["unique_identifier"] in delta):
+                if delta:
+                    items = [
+                        _apply_delta(item, delta[item["unique_identifier"]])
+                        if item["unique_identifier"] in delta else item
+                        for item in items
+                    ]
+                    self._snapshot = (journal.sequence, created, items)
+                # Consumers of a reused snapshot still watch the items
+                for item in self.core.item_manager.items.values():
+                    item.states.mark_read()
+                return journal.sequence, items
+
+        # Changes during the dump are sent again as a delta
+        sequence = journal.sequence
+        items = [
+            await self.dump_item(item)
+            for item in list(self.core.item_manager.items.values())
+        ]
+        items.extend(self.describe_lazy_items())
+        self._snapshot = (sequence, now, items)
+        return sequence, items
+
+    def describe_lazy_items(self, **filters) -> List[dict]:
+        """Returns information about lazy items, they have no states yet"""
+        return [
+            {**description, "states": {}}
+            for description in self.core.item_manager.describe_lazy(**filters)
+        ]
+
+    @staticmethod
+    async def dump_item(item: Item) -> dict:
+        """Returns information about an item"""
+        return {
+            "identifier": item.identifier,
+            "unique_identifier": item.unique_identifier,
+            "name": item.name,
+            "type": item.type,
+            "module": item.module.name,
+            "status": item.status.value,
+            "actions": list(item.actions.keys()),
+            "states": await item.states.dump(),
+            "implements": item.implements,
+            "metadata": item.metadata
+        }
+
+    def encode_message(self, message: dict) -> Optional[str]:
+        """Encodes a message to be sent to several sessions"""
+        try:
+            return json.dumps(message, core=self.core)
+        except (TypeError, ValueError):
+            LOGGER.warning("Couldn't encode message: %s", message)
+            return None
+
+    def broadcast_message(
+            self, message: dict,
+            sessions: Iterable["WebSocketSession"]) -> None:
+        """Encodes a message once and sends it to several sessions"""
+        encoded: Optional[str] = None
+        for session in sessions:
+            if encoded is None:
+                encoded = self.encode_message(message)
+                if encoded is None:
+                    return
+            session.send_message(encoded)
+
     async def stop(self) -> None:
+        if self._is_watched in self.core.item_manager.watch_checks:
+            self.core.item_manager.watch_checks.remove(self._is_watched)
         close_tasks = [session.close() for session in self.sessions]
         if not close_tasks:
             return
         await asyncio.wait(close_tasks, timeout=2)
 
 
+def _apply_delta(item: dict, delta: dict) -> dict:
+    """Returns a copy of an item's information with a delta applied"""
+    status = delta.get("status", item["status"])
+    states = {**item["states"], **delta.get("states", {})}
+    if status != ItemStatus.ONLINE.value:
+        # Like in a dump, items that aren't online have no state values
+        states = dict.fromkeys(states)
+    return {**item, "states": states, "status": status}
+
+
+def _comes_online(item: dict, delta: dict) -> bool:
+    """Checks if a delta brings an item back online"""
+    return (item["status"] != ItemStatus.ONLINE.value
+            and delta.get("status") == ItemStatus.ONLINE.value)
+
+
+# pylint: disable=too-many-instance-attributes
 class WebSocketSession:
     """
     A handler for WebSocket connections
+
+    Clients can negotiate batching when connecting with
+    /websocket?batch=true&batch_delay=<milliseconds>
+    Every frame is then a JSON array of the messages queued at that time.
+
+    Queued state changes for the same item are conflated
+    unless the client connects with conflate=false.
+    Only other messages count towards MAX_PENDING_WS_MSGS.
     """
     websocket: web.WebSocketResponse
     writer_task: asyncio.Task
     handler_task: asyncio.Task
     user: Optional["User"]
     subscriptions: set
+    batch: bool
+    batch_delay: float
+    conflate: bool
+    writing_queue: Deque[Union[str, dict, StateChangeMessage]]
+    pending_state_changes: Dict[str, StateChangeMessage]
 
     def __init__(
             self, core: "Core", module: Module, request: web.Request) -> None:
@@ -100,21 +294,75 @@ class WebSocketSession:
         self.command_handlers = self.module.command_handlers
         self.request = request
         self.user = self.request["user"] or None
-        self.writing_queue = asyncio.Queue(maxsize=MAX_PENDING_WS_MSGS)
+        self.writing_queue = deque()
+        self.pending_state_changes = {}
+        self._queue_event = asyncio.Event()
         self.subscriptions = set()
+        self.batch = request.query.get("batch", "").lower() in (
+            "1", "true")
+        self.conflate = request.query.get("conflate", "").lower() not in (
+            "0", "false")
+        try:
+            self.batch_delay = min(
+                max(float(request.query.get("batch_delay", 0)), 0),
+                MAX_WS_BATCH_DELAY) / 1000
+        except ValueError:
+            self.batch_delay = 0
+
+    async def _wait_for_messages(self) -> None:
+        while not self.writing_queue:
+            self._queue_event.clear()
+            await self._queue_event.wait()
+
+    def _pop_message(self) -> Union[str, dict]:
+        message = self.writing_queue.popleft()
+        if isinstance(message, StateChangeMessage):
+            del self.pending_state_changes[message.item]
+            return message.message()
+        return message
 
     async def writer(self):
         """Write the messages from the queue"""
+        if self.batch:
+            return await self.batch_writer()
+
         while not self.websocket.closed:
-            message: Union[str, dict] = await self.writing_queue.get()
+            await self._wait_for_messages()
+            message = self._pop_message()
             try:
                 if isinstance(message, str):
                     await self.websocket.send_str(message)
                 else:
-                    await self.websocket.send_json(message)
+                    await self.websocket.send_json(
+                        message, dumps=json.dumps)
             except (TypeError, ValueError):
                 LOGGER.warning("Couldn't encode message: %s", message)
 
+    async def batch_writer(self):
+        """Write everything queued as a single JSON array frame"""
+        while not self.websocket.closed:
+            await self._wait_for_messages()
+            if self.batch_delay:
+                await asyncio.sleep(self.batch_delay)
+            messages = []
+            while self.writing_queue:
+                messages.append(self._pop_message())
+
+            encoded_messages = []
+            for message in messages:
+                if isinstance(message, str):
+                    encoded_messages.append(message)
+                    continue
+                try:
+                    encoded_messages.append(
+                        json.dumps(message, core=self.core))
+                except (TypeError, ValueError):
+                    LOGGER.warning("Couldn't encode message: %s", message)
+
+            if encoded_messages:
+                await self.websocket.send_str(
+                    "[" + ",".join(encoded_messages) + "]")
+
     def dispatch_message(self, message: WebSocketMessage) -> None:
         """Dispatches an incoming WS message"""
         command = message.type
@@ -172,7 +420,7 @@ class WebSocketSession:
                     LOGGER.debug("Non-text data received")
                     break
                 try:
-                    data = MESSAGE_SCHEMA(message.json())
+                    data = MESSAGE_SCHEMA(message.json(loads=json.loads))
                     self.dispatch_message(WebSocketMessage(data))
                 except ValueError:
                     LOGGER.debug("Invalid JSON received")
@@ -193,9 +441,33 @@ class WebSocketSession:
     def send_message(self, message: Union[str, dict]) -> None:
         """
         Sends a message
-        message must be either of type str or JSON serialisable
+        message must be either a JSON encoded str or JSON serialisable
         """
-        try:
-            self.writing_queue.put_nowait(message)
-        except asyncio.QueueFull:
+        if (len(self.writing_queue) - len(self.pending_state_changes)
+                >= MAX_PENDING_WS_MSGS):
             self.core.loop.create_task(self.close())
+            return
+        self.writing_queue.append(message)
+        self._queue_event.set()
+
+    def send_state_change(
+            self, item: str, changes: dict, sequence: int,
+            encoded: str = None) -> None:
+        """
+        Sends a state_change message
+        Changes are merged into a queued message for the same item
+        if the session conflates
+        """
+        if not self.conflate:
+            self.send_message(encoded or StateChangeMessage(
+                item, changes, sequence).message())
+            return
+
+        pending = self.pending_state_changes.get(item)
+        if pending:
+            pending.merge(changes, sequence)
+            return
+        pending = self.pending_state_changes[item] = StateChangeMessage(
+            item, changes, sequence, encoded)
+        self.writing_queue.append(pending)
+        self._queue_event.set()
@@ -0,0 +1,98 @@
+"""State change subscriptions of WebSocket sessions"""
+from collections import defaultdict
+from typing import (TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, Optional,
+                    Set)
+
+if TYPE_CHECKING:
+    # pylint: disable=relative-beyond-top-level
+    from homecontrol.dependencies.entity_types import Item
+    from .module import WebSocketSession
+
+
+class StateSubscription:
+    """
+    A session's subscription to state changes
+
+    items and types select the items, states filters the changes.
+    A subscription without items and types receives every item.
+    """
+    __slots__ = ("session", "items", "types", "states")
+
+    def __init__(self,
+                 session: "WebSocketSession",
+                 items: Optional[Iterable[str]] = None,
+                 types: Optional[Iterable[str]] = None,
+                 states: Optional[Iterable[str]] = None) -> None:
+        self.session = session
+        self.items: FrozenSet[str] = frozenset(items or ())
+        self.types: FrozenSet[str] = frozenset(types or ())
+        self.states: Optional[FrozenSet[str]] = (
+            frozenset(states) if states is not None else None)
+
+    def matches(self, item: "Item") -> bool:
+        """Checks if the subscription selects an item"""
+        if not self.items and not self.types:
+            return True
+        if (item.unique_identifier in self.items
+                or item.identifier in self.items):
+            return True
+        return bool(self.types.intersection(item.implements))
+
+    def filter_changes(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the changes the subscription is interested in"""
+        if self.states is None:
+            return changes
+        return {
+            state: value for state, value in changes.items()
+            if state in self.states
+        }
+
+
+class StateSubscriptionIndex:
+    """Indexes state subscriptions by item identifier and item type"""
+
+    def __init__(self) -> None:
+        self.subscriptions: Dict["WebSocketSession", StateSubscription] = {}
+        self.by_item: Dict[str, Set[StateSubscription]] = defaultdict(set)
+        self.by_type: Dict[str, Set[StateSubscription]] = defaultdict(set)
+        self.unfiltered: Set[StateSubscription] = set()
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def add(self, subscription: StateSubscription) -> None:
+        """Adds a subscription replacing the session's previous one"""
+        self.remove(subscription.session)
+        self.subscriptions[subscription.session] = subscription
+        if not subscription.items and not subscription.types:
+            self.unfiltered.add(subscription)
+            return
+        for identifier in subscription.items:
+            self.by_item[identifier].add(subscription)
+        for item_type in subscription.types:
+            self.by_type[item_type].add(subscription)
+
+    def remove(self, session: "WebSocketSession") -> None:
+        """Removes the subscription of a session"""
+        subscription = self.subscriptions.pop(session, None)
+        if not subscription:
+            return
+        self.unfiltered.discard(subscription)
+        for index, keys in ((self.by_item, subscription.items),
+                            (self.by_type, subscription.types)):
+            for key in keys:
+                subscribers = index[key]
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del index[key]
+
+    def match(self, item: "Item") -> Set[StateSubscription]:
+        """Returns the subscriptions for an item"""
+        result = set(self.unfiltered)
+        result.update(self.by_item.get(item.unique_identifier, ()))
+        if item.identifier != item.unique_identifier:
+            result.update(self.by_item.get(item.identifier, ()))
+        if self.by_type:
+            for item_type in item.implements:
+                result.update(self.by_type.get(item_type, ()))
+        return result
@@ -1,5 +1,4 @@
 """Module for Yamaha AV receivers"""
-import asyncio
 import logging
 from typing import Optional
 
@@ -9,6 +8,7 @@ from requests.exceptions import ConnectionError
 
 from homecontrol.dependencies.action_decorator import action
 from homecontrol.dependencies.entity_types import Item
+from homecontrol.dependencies.scheduler import PollJob
 from homecontrol.dependencies.state_proxy import StateDef
 
 # pylint: disable=redefined-builtin
@@ -22,7 +22,7 @@ CTRL_URL = "http://{host}/YamahaRemoteControl/ctrl"
 
 class YamahaAVReceiver(Item):
     """The YamahaAVReceiver item"""
-    update_task: Optional[asyncio.Task] = None
+    update_job: Optional[PollJob] = None
     config_schema = vol.Schema({
         vol.Required("host"): str
     }, extra=vol.ALLOW_EXTRA)
@@ -45,7 +45,8 @@ class YamahaAVReceiver(Item):
         except (ConnectionError, ConnectionRefusedError):
             return False
 
-        self.update_task = self.core.loop.create_task(self.interval_update())
+        self.update_job = self.core.scheduler.add_job(
+            self.update, 2, name=f"{self.unique_identifier}.update")
 
     @on.setter(vol.Schema(bool))
     async def set_on(self, value: bool) -> dict:
@@ -143,12 +144,6 @@ class YamahaAVReceiver(Item):
         """Getter for playback status"""
         return self.av_receiver.is_playback_supported()
 
-    async def interval_update(self):
-        """Triggers the update every 2 seconds"""
-        while True:
-            await self.update()
-            await asyncio.sleep(2)
-
     async def update(self):
         """Updates play_status and inputs"""
         try:
@@ -163,5 +158,4 @@ class YamahaAVReceiver(Item):
         self.states.update("available_inputs", available_inputs)
 
     async def stop(self) -> None:
-        if self.update_task:
-            self.update_task.cancel()
+        self.core.scheduler.remove_job(self.update_job)
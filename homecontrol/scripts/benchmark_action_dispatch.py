@@ -0,0 +1,67 @@
+"""
+Measures the latency of looking up an item and running an action
+for different numbers of items
+
+Usage: python -m homecontrol.scripts.benchmark_action_dispatch
+"""
+import asyncio
+import tempfile
+import time
+from argparse import ArgumentParser
+from types import SimpleNamespace
+
+from homecontrol.dependencies.event_bus import EventBus
+from homecontrol.dependencies.item_manager import ItemManager
+from homecontrol.dependencies.scheduler import PollScheduler
+from homecontrol.scripts.benchmark_items import BenchmarkItem
+
+
+def parse_args():
+    """Parses the command line arguments"""
+    parser = ArgumentParser()
+    parser.add_argument("-c", "--counts", type=int, nargs="+",
+                        default=[100, 1000, 10000],
+                        help="Numbers of items to benchmark")
+    parser.add_argument("-r", "--runs", type=int, default=2000,
+                        help="Actions to run per item count")
+    return parser.parse_args()
+
+
+async def benchmark(count: int, runs: int, cfg_dir: str) -> None:
+    """Registers count items and measures the action dispatch latency"""
+    core = SimpleNamespace(
+        loop=asyncio.get_running_loop(), cfg_dir=cfg_dir,
+        start_args=SimpleNamespace())
+    core.event_bus = EventBus(core=core)
+    core.scheduler = PollScheduler(core=core)
+    core.item_manager = ItemManager(core=core)
+    BenchmarkItem.module = SimpleNamespace(name="benchmark")
+
+    for index in range(count):
+        await core.item_manager.register_item(
+            await BenchmarkItem.constructor(
+                f"item_{index}", f"Item {index}", {}, {}, core,
+                unique_identifier=f"benchmark_item_{index}"))
+
+    # Websocket commands look items up by unique identifier
+    unique_identifier = f"benchmark_item_{count - 1}"
+    start = time.perf_counter()
+    for _ in range(runs):
+        item = core.item_manager.get_item(unique_identifier)
+        await item.run_action("toggle", {})
+    duration = time.perf_counter() - start
+    print(f"{count:>7} items: {duration / runs * 1e6:.1f}µs per action")
+
+    await core.scheduler.stop()
+
+
+async def main() -> None:
+    """Runs the benchmark for every item count"""
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as cfg_dir:
+        for count in args.counts:
+            await benchmark(count, args.runs, cfg_dir)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
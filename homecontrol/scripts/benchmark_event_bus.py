@@ -0,0 +1,78 @@
+"""
+Measures the throughput of the EventBus during a state_change storm
+with synchronous handlers and with a task per handler
+
+Usage: python -m homecontrol.scripts.benchmark_event_bus [-n 50000]
+"""
+import asyncio
+import time
+from argparse import ArgumentParser
+from types import SimpleNamespace
+
+from homecontrol.const import EVENT_STATE_CHANGE
+from homecontrol.dependencies.event_bus import EventBus
+
+
+def parse_args():
+    """Parses the command line arguments"""
+    parser = ArgumentParser()
+    parser.add_argument("-n", type=int, default=50000,
+                        help="Number of state_change events")
+    parser.add_argument("-H", "--handlers", type=int, nargs="+",
+                        default=[1, 4],
+                        help="Numbers of handlers to benchmark")
+    return parser.parse_args()
+
+
+async def benchmark(count: int, handlers: int, sync: bool) -> float:
+    """Broadcasts count events and returns the time until all are handled"""
+    core = SimpleNamespace(loop=asyncio.get_running_loop())
+    event_bus = EventBus(core=core)
+    queue = []
+
+    # Like WatchStatesCommand.on_state_change, it only queues a message
+    def on_state_change(event, item, changes):
+        queue.append(changes)
+
+    async def on_state_change_async(event, item, changes):
+        queue.append(changes)
+
+    for _ in range(handlers):
+        if sync:
+            # Distinct callables, the bus keeps a set of handlers
+            event_bus.register(EVENT_STATE_CHANGE, sync=True)(
+                lambda event, **kwargs: on_state_change(event, **kwargs))
+        else:
+            event_bus.register(EVENT_STATE_CHANGE)(
+                lambda event, **kwargs: on_state_change_async(
+                    event, **kwargs))
+
+    item = SimpleNamespace(unique_identifier="benchmark_item")
+    start = time.perf_counter()
+    futures = []
+    for index in range(count):
+        futures.extend(event_bus.broadcast(
+            EVENT_STATE_CHANGE, item=item, changes={"value": index}))
+    if futures:
+        await asyncio.gather(*futures)
+    duration = time.perf_counter() - start
+    assert len(queue) == count * handlers
+    return duration
+
+
+async def main() -> None:
+    """Runs the benchmark for both dispatch modes"""
+    args = parse_args()
+    for handlers in args.handlers:
+        sync_time = await benchmark(args.n, handlers, sync=True)
+        task_time = await benchmark(args.n, handlers, sync=False)
+        print(f"{args.n} events, {handlers} handler(s): "
+              f"sync {sync_time:.3f}s "
+              f"({args.n / sync_time:,.0f} events/s), "
+              f"task per handler {task_time:.3f}s "
+              f"({args.n / task_time:,.0f} events/s), "
+              f"{task_time / sync_time:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
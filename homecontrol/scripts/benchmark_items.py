@@ -0,0 +1,86 @@
+"""
+Measures the time and memory needed to construct items,
+the main per-item cost at startup
+
+Usage: python -m homecontrol.scripts.benchmark_items [-n 10000]
+"""
+import asyncio
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from types import SimpleNamespace
+
+import voluptuous as vol
+
+from homecontrol.dependencies.action_decorator import action
+from homecontrol.dependencies.entity_types import Item
+from homecontrol.dependencies.event_bus import EventBus
+from homecontrol.dependencies.scheduler import PollScheduler
+from homecontrol.dependencies.state_proxy import StateDef
+
+
+class BenchmarkItem(Item):
+    """An item with a few typical states and actions"""
+    type = "benchmark.BenchmarkItem"
+    on = StateDef(default=False)
+    brightness = StateDef(default=0)
+    color = StateDef()
+    temperature = StateDef()
+    humidity = StateDef()
+    reachable = StateDef(default=True)
+
+    @on.setter(vol.Schema(bool))
+    async def set_on(self, value: bool) -> dict:
+        """Setter for on"""
+        return {"on": value}
+
+    @brightness.setter(vol.All(int, vol.Range(0, 255)))
+    async def set_brightness(self, value: int) -> dict:
+        """Setter for brightness"""
+        return {"brightness": value}
+
+    @color.getter()
+    async def get_color(self) -> str:
+        """Getter for color"""
+        return "#ffffff"
+
+    @action("toggle")
+    async def toggle(self) -> None:
+        """Toggles the item"""
+        await self.states.set("on", not self.states.states["on"].value)
+
+
+def parse_args():
+    """Parses the command line arguments"""
+    parser = ArgumentParser()
+    parser.add_argument("-n", type=int, default=10000,
+                        help="Number of items to construct")
+    return parser.parse_args()
+
+
+async def benchmark(count: int) -> None:
+    """Constructs count items and prints time and memory usage"""
+    core = SimpleNamespace(loop=asyncio.get_running_loop())
+    core.event_bus = EventBus(core=core)
+    core.scheduler = PollScheduler(core=core)
+
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    items = [
+        await BenchmarkItem.constructor(
+            f"item_{index}", f"Item {index}", {}, {}, core)
+        for index in range(count)
+    ]
+    duration = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+
+    print(f"Constructed {len(items)} items in {duration:.3f}s "
+          f"({duration / count * 1e6:.1f}µs per item)")
+    print(f"Memory: {memory / 2**20:.2f} MiB "
+          f"({memory / count:.0f} bytes per item)")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(parse_args().n))
@@ -0,0 +1,94 @@
+"""
+Measures the JSON encoding of item listings
+as sent by the API and the WebSocket
+
+Usage: python -m homecontrol.scripts.benchmark_json [-n 1000]
+"""
+import asyncio
+import json as stdlib_json
+import time
+from argparse import ArgumentParser
+from datetime import datetime
+from functools import partial
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+from homecontrol.dependencies import json
+from homecontrol.dependencies.entity_types import ItemStatus
+from homecontrol.dependencies.event_bus import EventBus
+from homecontrol.dependencies.scheduler import PollScheduler
+from homecontrol.scripts.benchmark_items import BenchmarkItem
+
+
+def parse_args():
+    """Parses the command line arguments"""
+    parser = ArgumentParser()
+    parser.add_argument("-n", type=int, default=1000,
+                        help="Number of items in the listing")
+    parser.add_argument("-r", "--runs", type=int, default=50,
+                        help="Encodings per codec")
+    return parser.parse_args()
+
+
+async def build_listing(count: int) -> List[dict]:
+    """Returns an item listing like the get_items command"""
+    core = SimpleNamespace(loop=asyncio.get_running_loop())
+    core.event_bus = EventBus(core=core)
+    core.scheduler = PollScheduler(core=core)
+    BenchmarkItem.module = SimpleNamespace(name="benchmark")
+    listing = []
+    for index in range(count):
+        item = await BenchmarkItem.constructor(
+            f"item_{index}", f"Item {index}", {}, {}, core,
+            unique_identifier=f"benchmark_item_{index}")
+        item.status = ItemStatus.ONLINE
+        listing.append({
+            "identifier": item.identifier,
+            "unique_identifier": item.unique_identifier,
+            "name": item.name,
+            "type": item.type,
+            "module": item.module.name,
+            # Enums and datetimes need the custom encoding
+            "status": item.status,
+            "actions": list(item.actions.keys()),
+            "states": await item.states.dump(),
+            "implements": item.implements,
+            "metadata": {"created": datetime.now()}
+        })
+    await core.scheduler.stop()
+    return listing
+
+
+def measure(encode: Callable[[Any], Any], data: Any, runs: int) -> float:
+    """Returns the mean encoding time in seconds"""
+    start = time.perf_counter()
+    for _ in range(runs):
+        encode(data)
+    return (time.perf_counter() - start) / runs
+
+
+async def main() -> None:
+    """Encodes the listing with every codec"""
+    args = parse_args()
+    listing = await build_listing(args.n)
+    codecs = {
+        # JSONResponse and the WebSocket before the codec layer
+        "stdlib, per-call encoder class, pretty": lambda data: (
+            stdlib_json.dumps(
+                data, cls=partial(json.JSONEncoder, core=None),
+                indent=4, sort_keys=True)),
+        "stdlib, per-call encoder class": lambda data: stdlib_json.dumps(
+            data, cls=partial(json.JSONEncoder, core=None)),
+        "json.dumps pretty": partial(json.dumps, indent=4, sort_keys=True),
+        f"json.dumps ({json.BACKEND})": json.dumps,
+        f"json.dumps_bytes ({json.BACKEND})": json.dumps_bytes,
+    }
+    size = len(json.dumps_bytes(listing))
+    print(f"{args.n} items, {size / 1024:.0f} KiB compact")
+    for name, encode in codecs.items():
+        duration = measure(encode, listing, args.runs)
+        print(f"{name:>40}: {duration * 1e3:.2f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Compares the storage engines by the time needed to load
+many small storages and to save a key in a large one
+
+Usage: python -m homecontrol.scripts.benchmark_storage [-n 1000]
+"""
+import asyncio
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from homecontrol.dependencies.storage import DictWrapper, Storage
+from homecontrol.dependencies.storage_engines import (JSONEngine,
+                                                      SQLiteEngine,
+                                                      StorageEngine)
+
+
+def parse_args():
+    """Parses the command line arguments"""
+    parser = ArgumentParser()
+    parser.add_argument("-n", type=int, default=1000,
+                        help="Number of item_data storages and tokens")
+    parser.add_argument("-w", "--writes", type=int, default=200,
+                        help="Number of saved keys")
+    return parser.parse_args()
+
+
+async def benchmark(
+        name: str, engine: StorageEngine, cfg_dir: str,
+        count: int, writes: int) -> None:
+    """Measures cold-load and write latency of an engine"""
+    loop = asyncio.get_running_loop()
+    storages = [
+        Storage(f"item_data/item_{index}", 1, cfg_dir=cfg_dir, loop=loop,
+                engine=engine, save_delay=0)
+        for index in range(count)
+    ]
+    for index, storage in enumerate(storages):
+        storage.engine.write(storage.name, (
+            '{"data": {"host": "192.168.0.%s", "port": 6053}, '
+            '"name": "%s", "last_update": "2021-01-01T00:00:00", '
+            '"version": 1}' % (index % 256, storage.name)))
+
+    start = time.perf_counter()
+    for index in range(count):
+        Storage(f"item_data/item_{index}", 1, cfg_dir=cfg_dir, loop=loop,
+                engine=engine).load_data()
+    load_time = time.perf_counter() - start
+
+    for journal in (False, True):
+        storage = Storage(
+            f"tokens_{journal}", 1, cfg_dir=cfg_dir, loop=loop,
+            engine=engine, storage_init=dict, save_delay=0, journal=journal)
+        tokens = DictWrapper(storage)
+        tokens.update({
+            f"token_{index}": {"token": "x" * 64, "client_id": "client"}
+            for index in range(count)
+        })
+        await storage.flush()
+
+        start = time.perf_counter()
+        for index in range(writes):
+            tokens[f"token_{index}"] = {"token": "y" * 64, "client_id": "x"}
+            await storage.flush()
+        write_time = (time.perf_counter() - start) / writes
+        mode = "journal" if journal else "snapshot"
+        print(f"{name:>6} {mode:>8} write: {write_time * 1e3:.2f}ms")
+
+    print(f"{name:>6} cold load of {count} storages: "
+          f"{load_time * 1e3:.1f}ms ({load_time / count * 1e6:.0f}µs each)")
+    engine.close()
+
+
+async def main() -> None:
+    """Runs the benchmark for every engine"""
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as cfg_dir:
+        await benchmark(
+            "json", JSONEngine(cfg_dir), cfg_dir, args.n, args.writes)
+    with tempfile.TemporaryDirectory() as cfg_dir:
+        await benchmark(
+            "sqlite", SQLiteEngine(cfg_dir), cfg_dir, args.n, args.writes)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
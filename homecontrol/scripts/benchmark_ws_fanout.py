@@ -0,0 +1,132 @@
+"""
+Measures the fan-out of state_change events to many WebSocket sessions,
+encoding the payload once per event against once per session
+
+Usage: python -m homecontrol.scripts.benchmark_ws_fanout [-s 100 500]
+"""
+import asyncio
+import time
+from argparse import ArgumentParser
+from types import SimpleNamespace
+from typing import List
+
+from homecontrol.const import EVENT_STATE_CHANGE
+from homecontrol.dependencies import json
+from homecontrol.dependencies.event_bus import Event, EventBus
+from homecontrol.modules.websocket.module import Module, WebSocketSession
+from homecontrol.modules.websocket.subscriptions import StateSubscription
+
+
+def parse_args():
+    """Parses the command line arguments"""
+    parser = ArgumentParser()
+    parser.add_argument("-s", "--sessions", type=int, nargs="+",
+                        default=[100, 500],
+                        help="Numbers of simulated sessions")
+    parser.add_argument("-n", type=int, default=500,
+                        help="Number of state_change events")
+    return parser.parse_args()
+
+
+class FakeRequest(dict):
+    """A request with the attributes WebSocketSession reads"""
+
+    def __init__(self) -> None:
+        super().__init__(user=None)
+        self.query = {}
+
+
+class FakeWebSocket:
+    """Counts the sent frames instead of sending them"""
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.bytes = 0
+
+    async def send_str(self, data: str) -> None:
+        """Send a text frame"""
+        self.frames += 1
+        self.bytes += len(data)
+
+    async def send_json(self, data, dumps) -> None:
+        """Encode and send a text frame like aiohttp does"""
+        await self.send_str(dumps(data))
+
+
+async def create_module(count: int) -> Module:
+    """Returns a WebSocket module with count subscribed sessions"""
+    core = SimpleNamespace(loop=asyncio.get_running_loop())
+    core.event_bus = EventBus(core=core)
+    core.item_manager = SimpleNamespace(watch_checks=[], items={})
+    module = Module.__new__(Module)
+    module.core = core
+    await module.init()
+    for _ in range(count):
+        session = WebSocketSession(core, module, FakeRequest())
+        session.websocket = FakeWebSocket()
+        module.sessions.add(session)
+        module.state_subscriptions.add(StateSubscription(session))
+    return module
+
+
+# pylint: disable=protected-access
+async def drain(sessions: List[WebSocketSession]) -> None:
+    """Sends the queued messages like WebSocketSession.writer"""
+    for session in sessions:
+        while session.writing_queue:
+            message = session._pop_message()
+            if isinstance(message, str):
+                await session.websocket.send_str(message)
+            else:
+                await session.websocket.send_json(message, dumps=json.dumps)
+
+
+def per_session(
+        module: Module, event: Event, item, changes: dict) -> None:
+    """The fan-out before encoding once, every session encodes itself"""
+    sequence = module.state_journal.record_state_change(
+        item.unique_identifier, changes)
+    for subscription in module.state_subscriptions.match(item):
+        subscription.session.send_state_change(
+            item.unique_identifier, subscription.filter_changes(changes),
+            sequence)
+
+
+async def benchmark(count: int, events: int, encode_once: bool) -> float:
+    """Returns the mean time to deliver an event to every session"""
+    module = await create_module(count)
+    sessions = list(module.sessions)
+    item = SimpleNamespace(
+        identifier="lamp", unique_identifier="benchmark_lamp",
+        implements=["switchable", "dimmable"])
+    event = Event(EVENT_STATE_CHANGE)
+
+    start = time.perf_counter()
+    for index in range(events):
+        changes = {"on": bool(index % 2), "brightness": index % 256,
+                   "color": "#ffaa00", "reachable": True}
+        if encode_once:
+            module.on_state_change(event, item, changes)
+        else:
+            per_session(module, event, item, changes)
+        await drain(sessions)
+    duration = (time.perf_counter() - start) / events
+
+    assert all(session.websocket.frames == events for session in sessions)
+    return duration
+
+
+async def main() -> None:
+    """Runs the benchmark for every number of sessions"""
+    args = parse_args()
+    for count in args.sessions:
+        per_session_time = await benchmark(count, args.n, False)
+        encode_once_time = await benchmark(count, args.n, True)
+        print(f"{count:>5} sessions: "
+              f"per-session encoding {per_session_time * 1e3:.3f}ms, "
+              f"encode once {encode_once_time * 1e3:.3f}ms per event "
+              f"({per_session_time / encode_once_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())